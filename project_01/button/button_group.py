@@ -0,0 +1,615 @@
+"""
+--------------------------------------------------------------------------
+Button Group Driver
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Group Driver
+
+  This driver watches any number of buttons from a single execution thread.
+Unlike ThreadedButton, which needs one thread per button, the number of 
+threads and wakeups stays the same no matter how many buttons are added.
+
+  Each button can have either a pull up resistor (active_low=True) or a pull
+down resistor (active_low=False); see the Button driver for details.
+
+Software API:
+
+  ButtonGroup(sleep_time=0.1, edge_detect=False, events=False, gpio_map=None)
+    - The sleep_time is the time between scans of all the buttons
+    - Each scan reads all pins with one PinSnapshot (see pin_snapshot.py).
+      With a GPIOMap (see gpio_mmap.py) that is one register load per GPIO
+      bank instead of one GPIO.input() call per button.
+    - If edge_detect is True, the thread sleeps until the kernel reports an
+      edge on any of the pins instead of scanning every "sleep_time".  If a
+      button has a pressed / unpressed callback, or a hold is being timed,
+      the group still wakes up every "sleep_time".  A press and release 
+      between two scans is only reported for an edge that left the pin at 
+      the pressed level.  Without a debouncer, presses within 
+      EDGE_BOUNCE_TIME of the last release are ignored as release bounce.
+    - If events is True, the group puts a ButtonEvent in a thread safe queue
+      for every press, release, hold, repeat and double click (see 
+      get_event())
+    
+    add_button(pin, active_low=True, hold_time=None, repeat_time=None, 
+               double_click_time=None, debounce_time=None, debounce_samples=None)
+      - Add a button to the group (before start()) and return it.
+      - hold_time:         Seconds held before an EVENT_HOLD (None = never)
+      - repeat_time:       Seconds between EVENT_REPEAT after the hold
+                           (None = no repeat)
+      - double_click_time: Maximum seconds between two presses for an
+                           EVENT_DOUBLE_CLICK (None = never)
+      - debounce_time / debounce_samples:  Debounce filter for the button
+                           (see debounce.py; None = not debounced)
+      - The returned GroupButton has the same API as ThreadedButton:
+          is_pressed(snapshot=None), get_last_press_duration(),
+          set_pressed_callback(), set_unpressed_callback(),
+          set_on_press_callback(), set_on_release_callback(),
+          get_pressed_callback_value(), get_unpressed_callback_value(),
+          get_on_press_callback_value(), get_on_release_callback_value(),
+          get_bounces_rejected()
+    
+    get_event(timeout=None)
+      - Wait up to timeout seconds (None = forever) for the next ButtonEvent
+        and return it, or return None if there was no event.  A ButtonEvent
+        has the fields:
+          type      - EVENT_PRESS, EVENT_RELEASE, EVENT_HOLD, EVENT_REPEAT 
+                      or EVENT_DOUBLE_CLICK
+          pin       - Pin of the button
+          timestamp - Time of the event (time.time())
+          duration  - Seconds the button has been / was pressed 
+                      (0.0 for EVENT_PRESS and EVENT_DOUBLE_CLICK)
+    
+    start()
+      - Starts the group thread
+
+    cleanup()
+      - Stops the group thread and waits for it to exit
+
+"""
+import time
+import queue
+import threading
+import collections
+
+import Adafruit_BBIO.GPIO as GPIO
+
+from debounce import Debouncer
+from pin_snapshot import PinSnapshot
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH               = GPIO.HIGH
+LOW                = GPIO.LOW
+
+EVENT_PRESS        = "press"
+EVENT_RELEASE      = "release"
+EVENT_HOLD         = "hold"
+EVENT_REPEAT       = "repeat"
+EVENT_DOUBLE_CLICK = "double_click"
+
+EDGE_BOUNCE_TIME   = 0.01   # seconds after a release in which edges to the 
+                            # pressed level are bounce (edge_detect, no debouncer)
+
+ButtonEvent        = collections.namedtuple("ButtonEvent", ["type", "pin", "timestamp", "duration"])
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class GroupButton():
+    """ One button of a ButtonGroup """
+    pin                           = None
+
+    unpressed_value               = None
+    pressed_value                 = None
+
+    pressed                       = None # state seen at the last scan
+    press_time                    = None
+    press_duration                = None
+    edge_seen                     = None # an edge to the pressed level arrived 
+                                         # since the last scan
+    press_edge_time               = None # time of that edge
+    release_time                  = None # time of the last release
+    bounce_pending                = None # a press was ignored as release bounce
+    
+    event_queue                   = None # None if events are not used
+    hold_time                     = None
+    repeat_time                   = None
+    double_click_time             = None
+    hold_sent                     = None
+    next_repeat_time              = None
+    last_press_time               = None # for double click detection
+    debouncer                     = None # None if not debounced
+    gpio_map                      = None # GPIOMap of the group, or None
+
+    pressed_callback              = None
+    pressed_callback_value        = None
+    unpressed_callback            = None
+    unpressed_callback_value      = None
+    on_press_callback             = None
+    on_press_callback_value       = None
+    on_release_callback           = None
+    on_release_callback_value     = None
+    
+    def __init__(self, pin, active_low=True, hold_time=None, repeat_time=None, 
+                 double_click_time=None, event_queue=None, debounce_time=None,
+                 debounce_samples=None, gpio_map=None):
+        """ Initialize variables """
+        self.pin      = pin
+        self.gpio_map = gpio_map
+        
+        if debounce_samples is not None:
+            self.debouncer = Debouncer(samples=debounce_samples)
+        elif debounce_time is not None:
+            self.debouncer = Debouncer(window=debounce_time)
+        
+        self.event_queue       = event_queue
+        self.hold_time         = hold_time
+        self.repeat_time       = repeat_time
+        self.double_click_time = double_click_time
+
+        if active_low:
+            self.unpressed_value = HIGH
+            self.pressed_value   = LOW
+        else:
+            self.unpressed_value = LOW
+            self.pressed_value   = HIGH
+
+        self.pressed         = False
+        self.press_duration  = 0.0
+        self.edge_seen       = False
+        self.bounce_pending  = False
+    
+    # End def
+
+
+    def is_pressed(self, snapshot=None):
+        """ Is the Button pressed?  Uses the value from the snapshot if given.
+        If debounced, this is the state seen at the last scan of the group 
+        (the filter is only updated by the group thread)
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        if self.debouncer is not None:
+            return self.pressed
+        
+        return self._read(snapshot) == self.pressed_value
+
+    # End def
+
+    
+    def _read(self, snapshot=None):
+        """ Return the pin value (or take it from the snapshot) """
+        if snapshot is not None:
+            return snapshot.input(self.pin)
+        
+        if self.gpio_map is not None:
+            return self.gpio_map.input(self.pin)
+        
+        return GPIO.input(self.pin)
+
+    # End def
+
+    
+    def get_last_press_duration(self):
+        """ Return the last press duration """
+        return self.press_duration
+    
+    # End def
+
+
+    def get_bounces_rejected(self):
+        """ Return the number of bounces rejected by the debounce filter """
+        if self.debouncer is None:
+            return 0
+        
+        return self.debouncer.get_bounces_rejected()
+
+    # End def
+
+
+    def _emit(self, event_type, now, duration=0.0):
+        """ Put an event in the event queue (if events are used) """
+        if self.event_queue is not None:
+            self.event_queue.put(ButtonEvent(event_type, self.pin, now, duration))
+
+    # End def
+
+
+    def _press(self, now):
+        """ Record a press and execute the on press callback """
+        self.pressed    = True
+        self.press_time = now
+        self.hold_sent  = False
+        
+        self._emit(EVENT_PRESS, now)
+        
+        if ((self.double_click_time is not None) and (self.last_press_time is not None) and
+            (now - self.last_press_time <= self.double_click_time)):
+            self._emit(EVENT_DOUBLE_CLICK, now)
+            # A third press starts a new double click
+            self.last_press_time = None
+        else:
+            self.last_press_time = now
+        
+        if self.on_press_callback is not None:
+            self.on_press_callback_value = self.on_press_callback()
+
+    # End def
+
+
+    def _release(self, now):
+        """ Record a release and execute the on release callback """
+        self.pressed        = False
+        self.press_duration = now - self.press_time
+        self.release_time   = now
+        
+        self._emit(EVENT_RELEASE, now, self.press_duration)
+        
+        if self.on_release_callback is not None:
+            self.on_release_callback_value = self.on_release_callback()
+
+    # End def
+
+
+    def _in_release_bounce(self, when):
+        """ Is a press at "when" the bounce of the last release?  Only used
+        without a debouncer (the debounce window covers it otherwise). """
+        if (self.debouncer is not None) or (self.release_time is None):
+            return False
+        
+        return when - self.release_time < EDGE_BOUNCE_TIME
+
+    # End def
+
+
+    def _update(self, value, now):
+        """ Process the pin value read by the group scan """
+        pressed = (value == self.pressed_value)
+        
+        if self.debouncer is not None:
+            pressed = self.debouncer.update(pressed, now)
+        
+        # Look again on the next scan, when the release has settled
+        self.bounce_pending = pressed and not self.pressed and self._in_release_bounce(now)
+        
+        if self.bounce_pending:
+            pressed = False
+        
+        if pressed and not self.pressed:
+            self._press(now)
+        elif not pressed and self.pressed:
+            self._release(now)
+        elif (self.edge_seen and not pressed and (self.debouncer is None) and
+              not self._in_release_bounce(self.press_edge_time)):
+            # Pressed and released again between two scans
+            self._press(now)
+            self._release(now)
+        
+        self.edge_seen = False
+        
+        if self.pressed:
+            self._check_hold(now)
+            if self.pressed_callback is not None:
+                self.pressed_callback_value = self.pressed_callback()
+        else:
+            if self.unpressed_callback is not None:
+                self.unpressed_callback_value = self.unpressed_callback()
+
+    # End def
+    
+    
+    def _check_hold(self, now):
+        """ Emit hold / repeat events while the button is held """
+        if self.hold_time is None:
+            return
+        
+        held = now - self.press_time
+        
+        if not self.hold_sent:
+            if held >= self.hold_time:
+                self.hold_sent = True
+                self._emit(EVENT_HOLD, now, held)
+                
+                if self.repeat_time is not None:
+                    self.next_repeat_time = self.press_time + self.hold_time + self.repeat_time
+                    
+        elif (self.repeat_time is not None) and (now >= self.next_repeat_time):
+            self._emit(EVENT_REPEAT, now, held)
+            self.next_repeat_time += self.repeat_time
+
+    # End def
+    
+    
+    def has_polled_callback(self):
+        """ Does the button need to be visited every "sleep_time"? """
+        if (self.pressed_callback is not None) or (self.unpressed_callback is not None):
+            return True
+        
+        # A debounced change is waiting to be confirmed
+        if (self.debouncer is not None) and not self.debouncer.is_settled():
+            return True
+        
+        # A press right after the release is waiting to be checked again
+        if self.bounce_pending:
+            return True
+        
+        # A hold is being timed
+        return self.pressed and (self.hold_time is not None)
+
+    # End def
+    
+    
+    # -----------------------------------------------------
+    # Callback Functions
+    # -----------------------------------------------------
+
+    def set_pressed_callback(self, function):
+        """ Function excuted every "sleep_time" while the button is pressed """
+        self.pressed_callback = function
+    
+    # End def
+
+    def get_pressed_callback_value(self):
+        """ Return value from pressed_callback function """
+        return self.pressed_callback_value
+    
+    # End def
+    
+    def set_unpressed_callback(self, function):
+        """ Function excuted every "sleep_time" while the button is unpressed """
+        self.unpressed_callback = function
+    
+    # End def
+
+    def get_unpressed_callback_value(self):
+        """ Return value from unpressed_callback function """
+        return self.unpressed_callback_value
+    
+    # End def
+
+    def set_on_press_callback(self, function):
+        """ Function excuted once when the button is pressed """
+        self.on_press_callback = function
+    
+    # End def
+
+    def get_on_press_callback_value(self):
+        """ Return value from on_press_callback function """
+        return self.on_press_callback_value
+    
+    # End def
+
+    def set_on_release_callback(self, function):
+        """ Function excuted once when the button is released """
+        self.on_release_callback = function
+    
+    # End def
+
+    def get_on_release_callback_value(self):
+        """ Return value from on_release_callback function """
+        return self.on_release_callback_value
+    
+    # End def    
+
+# End class
+
+
+class ButtonGroup(threading.Thread):
+    """ Button Group Class """
+    buttons                       = None
+    
+    sleep_time                    = None
+    edge_detect                   = None
+    edge_event                    = None
+    stop_event                    = None # set to stop the thread
+    event_queue                   = None
+    gpio_map                      = None
+    snapshot                      = None # reads all pins of the group
+    
+    def __init__(self, sleep_time=0.1, edge_detect=False, events=False, gpio_map=None):
+        """ Initialize variables """
+        # Call parent class constructor
+        threading.Thread.__init__(self)
+        
+        self.buttons         = []
+        self.sleep_time      = sleep_time
+        self.edge_detect     = edge_detect
+        self.edge_event      = threading.Event()
+        self.stop_event      = threading.Event()
+        self.gpio_map        = gpio_map
+        self.snapshot        = PinSnapshot([], gpio_map)
+        
+        if events:
+            self.event_queue = queue.Queue()
+    
+    # End def
+    
+    
+    def add_button(self, pin=None, active_low=True, hold_time=None, repeat_time=None, 
+                   double_click_time=None, debounce_time=None, debounce_samples=None):
+        """ Add a button to the group and return it """
+        if (pin == None):
+            raise ValueError("Pin not provided for add_button()")
+        
+        button = GroupButton(pin, active_low, hold_time, repeat_time, 
+                             double_click_time, self.event_queue, 
+                             debounce_time, debounce_samples, self.gpio_map)
+        
+        GPIO.setup(pin, GPIO.IN)
+        
+        # All pins share one edge event, so one wakeup serves every button
+        if self.edge_detect:
+            GPIO.add_event_detect(pin, GPIO.BOTH, callback=self._on_edge)
+        
+        self.buttons.append(button)
+        self.snapshot = PinSnapshot([b.pin for b in self.buttons], self.gpio_map)
+        
+        return button
+    
+    # End def
+
+
+    def _on_edge(self, channel):
+        """ Called by the GPIO library on every edge of any pin in the group """
+        now = time.time()
+        
+        # Only an edge that leaves the pin at the pressed level can be a press
+        for button in self.buttons:
+            if (button.pin == channel) and (button._read() == button.pressed_value):
+                button.press_edge_time = now
+                button.edge_seen       = True
+        
+        self.edge_event.set()
+
+    # End def
+
+
+    def get_event(self, timeout=None):
+        """ Wait up to timeout seconds (None = forever) for the next button
+        event.  Return the ButtonEvent, or None if there was no event. """
+        if self.event_queue is None:
+            raise ValueError("ButtonGroup created without events=True")
+        
+        try:
+            return self.event_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # End def
+
+
+    def _read_pins(self):
+        """ Return the current value of every pin in the group """
+        value = self.snapshot.read()
+        
+        return [(value >> index) & 1 for index in range(len(self.buttons))]
+
+    # End def
+
+
+    def _wait(self):
+        """ Wait for the next scan """
+        if not self.edge_detect:
+            # Sleep, but wake up right away if the thread is stopped
+            self.stop_event.wait(self.sleep_time)
+            return
+        
+        # Only wake up periodically if a button has a callback to execute
+        timeout = None
+        
+        for button in self.buttons:
+            if button.has_polled_callback():
+                timeout = self.sleep_time
+        
+        self.edge_event.wait(timeout)
+
+    # End def
+
+
+    def run(self):
+        """ Run the group thread.  Scan all buttons and execute callbacks. """
+        while not self.stop_event.is_set():
+            self.edge_event.clear()
+            
+            now    = time.time()
+            values = self._read_pins()
+            
+            for button, value in zip(self.buttons, values):
+                button._update(value, now)
+            
+            self._wait()
+        
+        # Stop edge detection
+        if self.edge_detect:
+            for button in self.buttons:
+                GPIO.remove_event_detect(button.pin)
+        
+    # End def
+
+    
+    def cleanup(self):
+        """ Stop the group thread and wait for it to exit """
+        self.stop_event.set()
+        
+        # Wake up the thread if it is blocked waiting for an edge
+        self.edge_event.set()
+        
+        if self.is_alive():
+            self.join()
+    
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    """ This test uses two buttons watched by a single thread.  Each button
+    prints a message when it is pressed and released.
+    """
+    print("Button Group Test")
+
+    group = ButtonGroup(edge_detect=True)
+    
+    for pin in ["P2_2", "P2_8"]:
+        button = group.add_button(pin)
+        
+        # Bind the pin name as a default argument so each callback keeps its own
+        button.set_on_press_callback(lambda pin=pin: print("{0}: pressed".format(pin)))
+        button.set_on_release_callback(lambda pin=pin: print("{0}: released".format(pin)))
+    
+    group.start()
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        while (True):
+            # Do nothing in the main thread
+            time.sleep(1)
+        
+    except KeyboardInterrupt:
+        group.cleanup()
+
+    print("Test Complete")
+
@@ -0,0 +1,117 @@
+"""
+--------------------------------------------------------------------------
+PocketBeagle GPIO Pin Table
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+PocketBeagle GPIO Pin Table
+
+  Maps PocketBeagle header pin names (as used with Adafruit_BBIO, e.g. 
+"P2_2" or "P2_02") to the Linux GPIO number used by the kernel 
+(/sys/class/gpio/gpio<N>).  The GPIO number also gives the AM335x GPIO bank
+(N // 32) and the bit within that bank (N % 32).
+
+Software API:
+
+  gpio_number(pin)
+    - Return the GPIO number for the pin.  Raises ValueError if the pin is
+      not a GPIO pin.
+
+  gpio_bank_bit(pin)
+    - Return (bank, bit) for the pin
+
+"""
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+GPIOS_PER_BANK              = 32
+
+# See https://github.com/beagleboard/pocketbeagle/wiki/System-Reference-Manual
+GPIO_NUMBERS                = { "P1_02" :  87, "P1_04" :  89, "P1_06" :   5,
+                                "P1_08" :   2, "P1_10" :   3, "P1_12" :   4,
+                                "P1_20" :  20, "P1_26" :  12, "P1_28" :  13,
+                                "P1_29" : 117, "P1_30" :  43, "P1_31" : 114,
+                                "P1_32" :  42, "P1_33" : 111, "P1_34" :  26,
+                                "P1_35" :  88, "P1_36" : 110,
+                                "P2_01" :  50, "P2_02" :  59, "P2_03" :  23,
+                                "P2_04" :  58, "P2_05" :  30, "P2_06" :  57,
+                                "P2_07" :  31, "P2_08" :  60, "P2_09" :  15,
+                                "P2_10" :  52, "P2_11" :  14, "P2_17" :  65,
+                                "P2_18" :  47, "P2_19" :  27, "P2_20" :  64,
+                                "P2_22" :  46, "P2_24" :  44, "P2_25" :  41,
+                                "P2_27" :  40, "P2_28" : 116, "P2_29" :   7,
+                                "P2_30" : 113, "P2_31" :  19, "P2_32" : 112,
+                                "P2_33" :  45, "P2_34" : 115, "P2_35" :  86,
+                                "USR0"  :  53, "USR1"  :  54, "USR2"  :  55,
+                                "USR3"  :  56
+                              }
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def normalize_pin(pin):
+    """ Return the pin name with a two digit pin number (e.g. "P2_2" -> "P2_02") """
+    pin = pin.upper()
+    
+    if "_" in pin:
+        header, number = pin.split("_", 1)
+        if number.isdigit():
+            pin = "{0}_{1:02d}".format(header, int(number))
+    
+    return pin
+
+# End def
+
+
+def gpio_number(pin):
+    """ Return the Linux GPIO number for the pin """
+    try:
+        return GPIO_NUMBERS[normalize_pin(pin)]
+    except KeyError:
+        raise ValueError("Pin {0} is not a GPIO pin".format(pin))
+
+# End def
+
+
+def gpio_bank_bit(pin):
+    """ Return the (bank, bit) of the pin """
+    return divmod(gpio_number(pin), GPIOS_PER_BANK)
+
+# End def
+
@@ -0,0 +1,204 @@
+"""
+--------------------------------------------------------------------------
+Batched GPIO Pin Snapshot
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Batched GPIO Pin Snapshot
+
+  Reads a set of pins at once and returns their values as one integer 
+bitmask:  bit i is the value (0 / 1) of the i-th pin in the list.  The pins 
+are grouped by AM335x GPIO bank when the snapshot is created, so with a 
+GPIOMap (see gpio_mmap.py) a read costs one DATAIN load per bank used (at 
+most four) no matter how many pins there are.  Without a GPIOMap, each pin 
+is read with Adafruit_BBIO.GPIO.input().
+
+  The bitmask can be decoded with input(), or passed to Button.is_pressed()
+and the other button drivers so that many buttons are checked from a 
+single read.
+
+Software API:
+
+  PinSnapshot(pins, gpio_map=None)
+    - Provide the list of pins (e.g. ["P2_2", "P2_4"]) and optionally a 
+      GPIOMap to read them from
+
+    read()
+      - Read all pins and return the bitmask (also kept in "value")
+
+    input(pin)
+      - Return the value (0 / 1) of the pin from the last read()
+
+  read_pins(pins, gpio_map=None)
+    - Return the bitmask for the pins.  The PinSnapshot for each list of 
+      pins is created once and reused.
+
+"""
+import Adafruit_BBIO.GPIO as GPIO
+
+from gpio_pins import gpio_bank_bit
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+snapshots                   = {}     # Shared snapshots, by (pins, gpio_map)
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def read_pins(pins, gpio_map=None):
+    """ Return the bitmask of the pins (bit i = value of pins[i]) """
+    key = (tuple(pins), id(gpio_map))
+    
+    if key not in snapshots:
+        snapshots[key] = PinSnapshot(pins, gpio_map)
+    
+    return snapshots[key].read()
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class PinSnapshot():
+    """ Batched read of a set of GPIO pins """
+    pins            = None
+    gpio_map        = None
+    banks           = None   # [(bank, [(bit, index), ...]), ...]
+    indexes         = None   # pin -> index in the bitmask
+    value           = None   # bitmask from the last read()
+    
+    def __init__(self, pins, gpio_map=None):
+        """ Group the pins by bank """
+        self.pins     = list(pins)
+        self.gpio_map = gpio_map
+        self.indexes  = {}
+        self.value    = 0
+        
+        groups = {}
+        
+        for index, pin in enumerate(self.pins):
+            self.indexes[pin] = index
+            
+            if gpio_map is not None:
+                bank, bit = gpio_bank_bit(pin)
+                groups.setdefault(bank, []).append((bit, index))
+        
+        self.banks = sorted(groups.items())
+    
+    # End def
+    
+    
+    def read(self):
+        """ Read all pins and return the bitmask """
+        value = 0
+        
+        if self.gpio_map is None:
+            for index, pin in enumerate(self.pins):
+                if GPIO.input(pin):
+                    value |= (1 << index)
+        else:
+            # One register load per bank
+            for bank, bits in self.banks:
+                datain = self.gpio_map.read_bank(bank)
+                
+                for bit, index in bits:
+                    value |= ((datain >> bit) & 1) << index
+        
+        self.value = value
+        
+        return value
+    
+    # End def
+    
+    
+    def input(self, pin):
+        """ Return the value (0 / 1) of the pin from the last read() """
+        return (self.value >> self.indexes[pin]) & 1
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import time
+    
+    import gpio_mmap
+
+    print("Pin Snapshot Test")
+    
+    # Run against a fake register map
+    path = os.path.join(tempfile.mkdtemp(), "gpio_regs")
+    gpio_mmap.create_fake_register_map(path)
+    gpio_map = gpio_mmap.open_gpio_map(path)
+    
+    pins     = ["P2_2", "P2_4", "P2_6", "P2_8", "P1_2", "P1_4", "P2_17", "P2_20"]
+    snapshot = PinSnapshot(pins, gpio_map)
+    
+    gpio_map.output("P2_4", 1)
+    gpio_map.output("P2_17", 1)
+    
+    print("Bitmask: {0:0{1}b}".format(snapshot.read(), len(pins)))
+    for pin in pins:
+        print("  {0}: {1}".format(pin, snapshot.input(pin)))
+    
+    # Time batched reads against per pin reads
+    count = 10000
+    start = time.time()
+    for i in range(count):
+        snapshot.read()
+    print("read():  {0:.2f} us for {1} pins".format((time.time() - start) / count * 1e6, len(pins)))
+    
+    start = time.time()
+    for i in range(count):
+        [gpio_map.input(pin) for pin in pins]
+    print("input(): {0:.2f} us for {1} pins".format((time.time() - start) / count * 1e6, len(pins)))
+    
+    gpio_map.close()
+    
+    print("Test Complete")
+
@@ -36,6 +36,24 @@ Software API:
   HT16K33(bus, address=0x70) # address is default (no soldering done)
     - Provide i2c bus that dispaly is on
     - Provide i2c address for the display
+    - Register writes go straight to /dev/i2c-<bus> from this process.  If 
+      that device cannot be opened, the driver falls back to running 
+      /usr/sbin/i2cset for each write.
+    - The driver keeps a copy of the display RAM.  With auto_flush=True 
+      (default) every call below is sent to the display right away in a 
+      single I2C transaction.  With auto_flush=False the calls only update
+      the copy, and flush() must be called to send it.
+
+    flush(force=False)
+      - Write the display RAM to the display in one I2C block write.  Only
+        the span of addresses that changed since the last flush is written, 
+        and nothing is written if nothing changed (unless force=True).
+        If the write fails (e.g. an I2C bus error), it is counted and the 
+        same span is written again by the next flush().
+
+    get_stats()
+      - Return a dictionary with the number of I2C writes issued, skipped
+        and failed, and the number of display RAM bytes written and skipped
     
     clear()
       - Sets value of display to "0000"
@@ -53,6 +71,13 @@ Software API:
       - Update the value on the display with text.
         The following characters are supported:
             "abcdefghijlnopqrstuyABCDEFGHIJLNOPQRSTUY? -"
+
+    cleanup()
+      - Release the I2C bus
+
+  number_patterns() / text_pattern(value)
+    - Segment patterns used by update(), display_number() and text().  The
+      number table (0 - 9999) is built on first use; text patterns are cached.
   
 --------------------------------------------------------------------------
 Background Information: 
@@ -74,6 +99,8 @@ Background Information:
         
 """
 import os
+import fcntl
+import functools
 
 
 # ------------------------------------------------------------------------
@@ -151,40 +178,207 @@ HT16K33_BRIGHTNESS_DARKEST  = 0x00
 # Maximum decimal value that can be displayed on 4 digit Hex Display
 HT16K33_MAX_VALUE           = 9999
 
+# Size of the HT16K33 display RAM (addresses 0x00 - 0x0F)
+HT16K33_RAM_SIZE            = 16
+
+# Number of cached text() patterns
+TEXT_CACHE_SIZE             = 256
+
+# Linux i2c-dev ioctl to select the slave address (see linux/i2c-dev.h)
+I2C_SLAVE                   = 0x0703
+I2CSET                      = "/usr/sbin/i2cset"
+
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# Segment patterns for 0 - 9999; built on first use by number_patterns()
+number_table                = None
 
 # ------------------------------------------------------------------------
 # Functions / Classes
 # ------------------------------------------------------------------------
+def number_patterns():
+    """ Return a list, indexed by value (0 - 9999), of the four digit segment
+    patterns (bytes) that display that value.  The table is built on the 
+    first call and reused afterwards. """
+    global number_table
+    
+    if number_table is None:
+        number_table = [bytes((HEX_DIGITS[(value // 1000) % 10],
+                               HEX_DIGITS[(value // 100) % 10],
+                               HEX_DIGITS[(value // 10) % 10],
+                               HEX_DIGITS[value % 10]))
+                        for value in range(HT16K33_MAX_VALUE + 1)]
+    
+    return number_table
+
+# End def
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_pattern(value):
+    """ Return the four digit segment patterns (bytes) that display the text
+    value; unused digits are blank.  Results are cached.
+    
+    Will throw a ValueError if a character is not supported.
+    """
+    pattern = bytearray(len(DIGIT_ADDR))
+    
+    for i, char in enumerate(value):
+        code = LETTERS.get(char)
+        if code is None:
+            raise ValueError("Character {0} not supported".format(char))
+        pattern[i] = code
+    
+    return bytes(pattern)
+
+# End def
+
+
+class I2CDevice():
+    """ Persistent handle on an I2C device through /dev/i2c-<bus> 
+    
+    The device file is opened once; each register write is then a single 
+    write() system call instead of a fork / exec of i2cset.
+    """
+    fd      = None
+    
+    def __init__(self, bus, address):
+        """ Open the bus and select the slave address.  Raises OSError if the 
+        bus is not available. """
+        self.fd = os.open("/dev/i2c-{0}".format(bus), os.O_RDWR)
+        
+        try:
+            fcntl.ioctl(self.fd, I2C_SLAVE, address)
+        except OSError:
+            self.close()
+            raise
+    
+    # End def
+
+    def write_command(self, command):
+        """ Write a single command byte """
+        os.write(self.fd, bytes([command]))
+    
+    # End def
+
+    def write_byte_data(self, register, value):
+        """ Write a single byte to a register """
+        os.write(self.fd, bytes([register, value]))
+    
+    # End def
+
+    def write_block_data(self, register, data):
+        """ Write consecutive registers, starting at register, in one transaction """
+        os.write(self.fd, bytes([register]) + bytes(data))
+    
+    # End def
+
+    def close(self):
+        """ Close the bus """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+    
+    # End def
+
+# End class
+
+
+class I2CSetCommand():
+    """ Fallback I2C access that spawns i2cset for every write """
+    command = None
+    
+    def __init__(self, bus, address):
+        """ Build the i2cset command for the device """
+        self.command = "{0} -y {1} {2}".format(I2CSET, bus, address)
+    
+    # End def
+
+    def write_command(self, command):
+        """ Write a single command byte """
+        os.system("{0} {1}".format(self.command, command))
+    
+    # End def
+
+    def write_byte_data(self, register, value):
+        """ Write a single byte to a register """
+        os.system("{0} {1} {2}".format(self.command, register, value))
+    
+    # End def
+
+    def write_block_data(self, register, data):
+        """ Write consecutive registers, starting at register, in one transaction """
+        values = " ".join(str(value) for value in data)
+        os.system("{0} {1} {2} i".format(self.command, register, values))
+    
+    # End def
+
+    def close(self):
+        """ Nothing to close """
+        pass
+    
+    # End def
+
+# End class
+
+
+def open_i2c_device(bus, address):
+    """ Return an I2CDevice for the display, or an I2CSetCommand if the 
+    bus cannot be opened from this process. """
+    try:
+        return I2CDevice(bus, address)
+    except OSError:
+        return I2CSetCommand(bus, address)
+
+# End def
+
+
 class HT16K33():
     """ Class to manage a HT16K33 I2C display """
     # Class variables
-    bus     = None
-    address = None
-    command = None
+    bus        = None
+    address    = None
+    device     = None
+    buffer     = None   # copy of the display RAM
+    written    = None   # display RAM as last written to the display
+    auto_flush = None
+    stats      = None
     
-    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST):
+    def __init__(self, bus, address=0x70, blink=HT16K33_BLINK_OFF, brightness=HT16K33_BRIGHTNESS_HIGHEST, auto_flush=True):
         """ Initialize class variables; Set up display; Set display to blank """
         
         # Initialize class variables
         self.bus = bus
         self.address = address
-        self.command = "/usr/sbin/i2cset -y {0} {1}".format(bus, address)
+        self.device = open_i2c_device(bus, address)
+        self.buffer = bytearray(HT16K33_RAM_SIZE)
+        self.written = None
+        self.auto_flush = auto_flush
+        self.stats = {"writes_issued"  : 0,
+                      "writes_skipped" : 0,
+                      "writes_failed"  : 0,
+                      "bytes_written"  : 0,
+                      "bytes_skipped"  : 0}
 
         # Set up display        
         self._setup(blink, brightness)
         # Set display to blank
-        self.blank()   
+        self._blank()
+        self.flush()
     # End def
     
     def _setup(self, blink, brightness):
         """Initialize the display itself"""
-        if self.command:
+        if self.device:
             # i2cset -y 1 0x70 0x21
-            os.system("{0} {1}".format(self.command, (HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)))
+            self.device.write_command(HT16K33_SYSTEM_SETUP | HT16K33_OSCILLATOR)
             # i2cset -y 1 0x70 0x81
-            os.system("{0} {1}".format(self.command, (HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)))
+            self.device.write_command(HT16K33_BLINK_CMD | blink | HT16K33_BLINK_DISPLAYON)
             # i2cset -y 1 0x70 0xEF
-            os.system("{0} {1}".format(self.command, (HT16K33_BRIGHTNESS_CMD | brightness)))
+            self.device.write_command(HT16K33_BRIGHTNESS_CMD | brightness)
         else:
             print("HT16K33 setup()")
 
@@ -216,61 +410,134 @@ class HT16K33():
     # End def
 
 
+    def flush(self, force=False):
+        """Write the changed part of the display RAM to the display in one 
+        I2C transaction.
+        
+        Only the addresses between the first and last byte that differ from 
+        what was last written are sent.  If nothing changed, no write is 
+        issued.  force=True writes the whole display RAM.
+        """
+        if force or (self.written is None):
+            start, end = 0, HT16K33_RAM_SIZE
+        else:
+            dirty = [addr for addr in range(HT16K33_RAM_SIZE) 
+                     if self.buffer[addr] != self.written[addr]]
+            
+            if not dirty:
+                self.stats["writes_skipped"] += 1
+                self.stats["bytes_skipped"]  += HT16K33_RAM_SIZE
+                return
+            
+            start, end = dirty[0], dirty[-1] + 1
+
+        if self.device:
+            # The bus is shared (RTC, light sensor), so a NACK or bus error 
+            # must not stop the caller; keep "written" so the next flush 
+            # retries the same span
+            try:
+                if (end - start) == 1:
+                    self.device.write_byte_data(start, self.buffer[start])
+                else:
+                    self.device.write_block_data(start, self.buffer[start:end])
+            except OSError:
+                self.stats["writes_failed"] += 1
+                return
+        else:
+            print("HT16K33 flush() = {0}".format(self.buffer.hex()))
+
+        self.written = bytearray(self.buffer)
+        
+        self.stats["writes_issued"] += 1
+        self.stats["bytes_written"] += end - start
+        self.stats["bytes_skipped"] += HT16K33_RAM_SIZE - (end - start)
+
+    # End def
+
+
+    def get_stats(self):
+        """Return the display write statistics"""
+        return dict(self.stats)
+
+    # End def
+
+
+    def _changed(self):
+        """Flush the display RAM if auto_flush is enabled."""
+        if self.auto_flush:
+            self.flush()
+
+    # End def
+
+
+    def _blank(self):
+        """Clear the display RAM (colon and all digits)"""
+        for addr in DIGIT_ADDR:
+            self.buffer[addr] = 0x00
+        self.buffer[COLON_ADDR] = 0x00
+
+    # End def
+
+
+    def _set_pattern(self, pattern):
+        """Set all four digits of the display RAM to a 4 byte segment pattern"""
+        buffer = self.buffer
+        (buffer[DIGIT_ADDR[0]], buffer[DIGIT_ADDR[1]], 
+         buffer[DIGIT_ADDR[2]], buffer[DIGIT_ADDR[3]]) = pattern
+
+    # End def
+
+
+    def _set_value(self, value):
+        """Set all four digits of the display RAM to a decimal value"""
+        if (value < 0) or (value > HT16K33_MAX_VALUE):
+            raise ValueError("Value must be between 0 and 9999.")
+        
+        self._set_pattern(number_patterns()[value])
+
+    # End def
+
+
     def set_digit(self, digit_number, data, double_point=False):
         """Update the given digit of the display."""
-        if self.command:
-            os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], self.encode(data, double_point)))    
-        else:
-            print("HT16K33 set_digit() = {0}".format(self.encode(data, double_point)))
+        self.buffer[DIGIT_ADDR[digit_number]] = self.encode(data, double_point)
+        self._changed()
 
     # End def
 
 
     def set_digit_raw(self, digit_number, data, double_point=False):
         """Update the given digit of the display using raw data value"""
-        if self.command:
-            os.system("{0} {1} {2}".format(self.command, DIGIT_ADDR[digit_number], data))
-        else:
-            print("HT16K33 set_digit_raw() = 0x{0:x}".format(data))
+        self.buffer[DIGIT_ADDR[digit_number]] = data
+        self._changed()
 
     # End def
 
 
     def set_colon(self, enable):
         """Set the colon on the display."""
-        if self.command:
-            if enable:
-                os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x02))
-            else:
-                os.system("{0} {1} {2}".format(self.command, COLON_ADDR, 0x00))
+        if enable:
+            self.buffer[COLON_ADDR] = 0x02
         else:
-            print("HT16K33 set_colon() = {0}".format(enable))
+            self.buffer[COLON_ADDR] = 0x00
+        self._changed()
 
     # End def        
 
 
     def blank(self):
         """Clear the display to read nothing"""
-        if self.command:
-            self.set_colon(False)
-            # each digit gets set to 0
-            self.set_digit_raw(3, 0x00)
-            self.set_digit_raw(2, 0x00)
-            self.set_digit_raw(1, 0x00)
-            self.set_digit_raw(0, 0x00)
-        else:
-            print("HT16K33 blank()")
+        self._blank()
+        self._changed()
 
     # End def
 
 
     def clear(self):
         """Clear the display to read '0000'"""
-        if self.command:
-            self.set_colon(False)
-            self.update(0)
-        else:
-            print("HT16K33 clear()")        
+        self.buffer[COLON_ADDR] = 0x00
+        self._set_value(0)
+        self._changed()
 
     # End def
 
@@ -285,13 +552,8 @@ class HT16K33():
         Will throw a ValueError if number is not between 0 and 9999.
         """
         
-        if (value < 0) or (value > HT16K33_MAX_VALUE):
-            raise ValueError("Value must be between 0 and 9999.")
-        
-        self.set_digit(3, (value % 10))
-        self.set_digit(2, ((value//10) % 10))
-        self.set_digit(1, ((value//100) % 10))
-        self.set_digit(0, ((value//1000) % 10))
+        self._set_value(value)
+        self._changed()
         
         # Modify code to implement this function
         print("Set value = {0}".format(value)) # Remove when updating code
@@ -309,28 +571,26 @@ class HT16K33():
         if ((len(value) < 1) or (len(value) > 4)):
             raise ValueError("Must have between 1 and 4 characters")        
         
-        # Clear the display
-        self.blank()
-
-        # Set the display to the correct characters        
-        for i, char in enumerate(value):
-            try:
-                # Translate the character into the value needed for hex display
-                code = LETTERS[char]
-                
-                # Set the display digit with the character value
-                self.set_digit_raw(i, code) # raw bc not just numbers
-            except:
-                raise ValueError("Character {0} not supported".format(char))
+        # Set the display to the correct characters (unused digits blank)
+        self._set_pattern(text_pattern(value))
+        self.buffer[COLON_ADDR] = 0x00
+        
+        self._changed()
                 
     def display_number(self, number):
         """Displays a 4-digit number on the display"""
         if not (0 <= number <= 9999):
             raise ValueError("Number must be between 0 and 9999")
 
-        digits = f"{number:04d}"  # Pad with zeroes
-        for i, digit_char in enumerate(digits):
-            self.set_digit(i, int(digit_char))
+        self._set_pattern(number_patterns()[number])  # Padded with zeroes
+        self._changed()
+
+    def cleanup(self):
+        """Release the I2C bus"""
+        if self.device:
+            self.device.close()
+
+    # End def
 
 # End class
 
@@ -0,0 +1,235 @@
+"""
+--------------------------------------------------------------------------
+LED Strip Color Lookup Tables
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+LED Strip Color Lookup Tables
+
+  Perceptual correction for the LED strip, applied on the client before the
+pixels are sent to the OPC server.  The settings are read from the LEDscape
+server configuration (config.json):
+
+    - lumCurvePower:      Gamma of the luminance curve (e.g. 2.0)
+    - whitePoint:         Scale of the red / green / blue channels at full 
+                          brightness (e.g. red 0.9 to balance a blue-ish white)
+    - colorChannelOrder:  Order of the channels on the wire (e.g. "BRG")
+
+  The correction is one 256-entry curve per output channel that combines 
+the gamma curve and the white point:
+
+    curve[channel][value] = white[channel] * (value / 255) ^ gamma
+
+  The curve is the light output (0.0 - 1.0) at full brightness.  The gamma
+curve makes equal steps in a color value look like equal steps in light; 
+brightness scales the light output linearly.  For each brightness, the 
+curve is combined with the brightness into one 256-entry byte table per 
+output channel:
+
+    table[channel][value] = round(curve[channel][value] * brightness)
+
+  Tables are cached per brightness, so correcting a frame is a lookup per 
+channel (bytes.translate() in apply(), a numpy gather in PixelStrip) with
+no per-pixel math.  The float curve is kept for callers that want the 
+value before rounding (e.g. opc.Ditherer, see PixelStrip.render_exact()).
+
+  The server applies its own lookup table when "enableLookupTable" is true,
+and reorders channels to "colorChannelOrder" when it drives the strip.  
+Turn the server lookup table off when using these tables, otherwise the 
+gamma is applied twice.  Only set reorder_channels=True if the server 
+passes the bytes to the strip unchanged.
+
+Software API:
+
+  ColorLUT(gamma=1.0, white_point=(1.0, 1.0, 1.0), channel_order="RGB", 
+           reorder_channels=False)
+    - Create the lookup tables
+
+    ColorLUT.from_config(path=CONFIG_FILE, reorder_channels=False)
+      - Create the lookup tables from the server configuration file
+
+    curve
+      - Three 256 entry tuples of floats (one per output channel):  light 
+        output of each 8-bit value at full brightness
+
+    sources
+      - Input channel (0 = R, 1 = G, 2 = B) of each output channel
+
+    table(brightness=255)
+      - Return the three 256 byte tables (one per output channel) for the
+        brightness
+
+    color(color, brightness=255)
+      - Return the corrected (R, G, B) color for the brightness
+
+    apply(pixels, brightness=255, out=None)
+      - Correct a frame of packed RGB bytes.  The result is written to
+        "out" (e.g. FrameBuffer.pixels) if given and returned.
+
+"""
+import os
+import json
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+CONFIG_FILE                 = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                                           "config.json")
+
+CHANNELS                    = "RGB"
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class ColorLUT():
+    """ Brightness, gamma, white point and channel order lookup tables """
+    gamma           = None
+    white_point     = None
+    sources         = None   # input channel of each output channel
+    curve           = None   # light output of each value, per output channel
+    tables          = None   # cache of the tables, by brightness
+    
+    def __init__(self, gamma=1.0, white_point=(1.0, 1.0, 1.0), channel_order="RGB", 
+                 reorder_channels=False):
+        """ Initialize the lookup tables """
+        channel_order = channel_order.upper()
+        
+        if sorted(channel_order) != sorted(CHANNELS):
+            raise ValueError("Channel order {0!r} is not a permutation of RGB".format(channel_order))
+        
+        self.gamma       = float(gamma)
+        self.white_point = tuple(float(w) for w in white_point)
+        self.tables      = {}
+        
+        if reorder_channels:
+            self.sources = tuple(CHANNELS.index(c) for c in channel_order)
+        else:
+            self.sources = (0, 1, 2)
+        
+        self.curve = tuple(tuple(self.white_point[source] * (value / 255.0) ** self.gamma
+                                 for value in range(256))
+                           for source in self.sources)
+    
+    # End def
+    
+    
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE, reorder_channels=False):
+        """ Create the lookup tables from the LEDscape server configuration """
+        with open(path) as f:
+            config = json.load(f)
+        
+        white = config.get("whitePoint", {})
+        
+        return cls(config.get("lumCurvePower", 1.0),
+                   (white.get("red", 1.0), white.get("green", 1.0), white.get("blue", 1.0)),
+                   config.get("colorChannelOrder", "RGB"),
+                   reorder_channels)
+    
+    # End def
+    
+    
+    def table(self, brightness=255):
+        """ Return the three 256 byte tables (one per output channel) """
+        brightness = max(0, min(255, int(round(brightness))))
+        
+        if brightness not in self.tables:
+            self.tables[brightness] = tuple(bytes(int(round(light * brightness)) for light in channel)
+                                            for channel in self.curve)
+        
+        return self.tables[brightness]
+    
+    # End def
+    
+    
+    def color(self, color, brightness=255):
+        """ Return the corrected (R, G, B) color for the brightness """
+        tables = self.table(brightness)
+        
+        return tuple(tables[i][color[source]] for i, source in enumerate(self.sources))
+    
+    # End def
+    
+    
+    def apply(self, pixels, brightness=255, out=None):
+        """ Correct a frame of packed RGB bytes and return it """
+        pixels = bytes(pixels)
+        tables = self.table(brightness)
+        
+        if out is None:
+            out = bytearray(len(pixels))
+        
+        # One translate per channel over the whole frame
+        for i, source in enumerate(self.sources):
+            out[i::3] = pixels[source::3].translate(tables[i])
+        
+        return out
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+    
+    print("Color LUT Test")
+    
+    lut = ColorLUT.from_config()
+    print("Gamma: {0}, white point: {1}".format(lut.gamma, lut.white_point))
+    
+    # Distinct output levels of a white color at a few brightness settings
+    for brightness in [50, 100, 200, 255]:
+        levels = set(lut.table(brightness)[1])
+        print("Brightness {0:3d}: white -> {1}, {2} levels".format(
+              brightness, lut.color((255, 255, 255), brightness), len(levels)))
+    
+    # Time a full strip
+    pixels = bytes(range(240)) * 3
+    count  = 1000
+    start  = time.time()
+    for i in range(count):
+        lut.apply(pixels, 100)
+    print("apply(): {0:.1f} us for 240 pixels".format((time.time() - start) / count * 1e6))
+    
+    print("Test Complete")
+
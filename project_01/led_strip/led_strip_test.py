@@ -78,13 +78,15 @@ time.sleep(1)
 #need pretty much everything up to here
 # Uses each light's address to set display to set a color
 def task():
+    # Reuse one preallocated frame instead of building a new pixel list each step
+    frame = client.frame_buffer(STR_LEN, channel=0)
+    
     while True:
         print("loop")
         for i in range (0, 255):
-            for j in range(STR_LEN):
-                leds[j] = (0, 0, i)
+            frame.fill((0, 0, i))
     
-            if not client.put_pixels(leds, channel=0):
+            if not client.send_frame(frame):
                 print ('not connected')
             
             time.sleep(0.1)
@@ -31,17 +31,104 @@ Recommended use:
             print('not connected')
         time.sleep(1/30.0)
 
+For tight animation loops, reuse one preallocated frame instead:
+
+    frame = client.frame_buffer(240, channel=0)
+    while True:
+        frame.fill((0, 0, 255))
+        client.send_frame(frame)
+        time.sleep(1/30.0)
+
+To drive several strips in lockstep, send all of their channels at once.
+The messages are packed together and written with a single system call:
+
+    client.put_frames({1: strip_1_pixels, 2: strip_2_pixels})
+
+To cap the output rate when frames are produced at irregular rates (e.g.
+from button callbacks), put a FrameScheduler between the producers and the
+client.  Only the newest frame per channel in each frame interval is sent:
+
+    scheduler = opc.FrameScheduler(client, fps=30)
+    scheduler.start()
+    scheduler.put_pixels(my_pixels, channel=0)   # returns immediately
+    ...
+    scheduler.cleanup()
+
+For fades that need levels between the 8-bit steps (e.g. a slow ramp at low
+brightness), set a floating point frame on a Ditherer.  It sends frames at
+the given rate and spreads the fractional part over time:
+
+    ditherer = opc.Ditherer(client, 240, fps=60)
+    ditherer.start()
+    ditherer.fill((2.25, 1.5, 0.0))   # shown as the average of several frames
+    ...
+    ditherer.cleanup()
+
+From an asyncio application, use AsyncClient so rendering never waits on
+the network:
+
+    async def main():
+        client = opc.AsyncClient('localhost:7890')
+        client.start()
+        while True:
+            client.put_pixels(my_pixels, channel=0)   # never blocks
+            await asyncio.sleep(1/30.0)
+
 """
 
+import asyncio
+import collections
+import math
 import socket
+import statistics
 import struct
 import sys
+import threading
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 SET_PIXEL_COLOURS = 0  # "Set pixel colours" command (see openpixelcontrol.org)
 
+MAX_UDP_MESSAGE = 65507  # largest payload that fits in a single UDP datagram
+
+DITHER_TOLERANCE = 1e-6  # fractions / errors smaller than this count as zero
+
+
+def encode_pixels(pixels):
+    """Serialize a frame of pixel colors into the OPC payload byte string.
+
+    pixels may be any of:
+    * A list of 3-tuples of rgb colors, as accepted by put_pixels.
+    * An (N, 3) numpy array of any numeric dtype.  uint8 arrays are used
+      as-is; other dtypes are clamped to 0-255 and truncated to integers.
+    * A bytes-like object (bytes, bytearray, memoryview) that already holds
+      packed r, g, b bytes.  It is used without any conversion.
+
+    When numpy is available the whole frame is clipped, cast and serialized
+    in one vectorized step; otherwise a pure Python path is used.
+
+    """
+    if isinstance(pixels, (bytes, bytearray, memoryview)):
+        return bytes(pixels)
+
+    if numpy is not None:
+        array = numpy.asarray(pixels)
+        if array.dtype != numpy.uint8:
+            array = numpy.clip(array, 0, 255).astype(numpy.uint8)
+        return array.tobytes()
+
+    return bytes(bytearray(min(255, max(0, int(value)))
+                           for pixel in pixels for value in pixel))
+
 
 class Client(object):
-    def __init__(self, server_ip_port, long_connection=True, verbose=False):
+    def __init__(self, server_ip_port, long_connection=True, verbose=False, udp=False,
+                 udp_port=None, send_buffer_size=None, reconnect_delay=0.1, max_reconnect_delay=5.0,
+                 stats_window=100):
         """Create an OPC client object which sends pixels to an OPC server.
 
         server_ip_port should be an ip:port or hostname:port as a single string.
@@ -57,6 +144,31 @@ class Client(object):
           call to put_pixels. Keeping the connection usually closed makes it
           possible for others to also connect to the server.
 
+        If udp is True, frames are sent as UDP datagrams to the server's
+        opcUdpPort instead of over the TCP connection.  Lost frames are simply
+        replaced by the next one, so there is no head-of-line blocking.  Frames
+        sent with reliable=True (and frames too large for one datagram) still
+        go over TCP, e.g. for a final off() that must reach the strip.
+        udp_port is the server's opcUdpPort; it defaults to the TCP port in
+        server_ip_port.
+
+        Over TCP, Nagle's algorithm is turned off (TCP_NODELAY) so small
+        frames are not held back, and send_buffer_size (if given) sets the
+        socket send buffer (SO_SNDBUF), e.g. to hold a few whole frames.
+        Every message is written completely (sendall) or the connection is
+        dropped, so a short write can never leave the server reading the
+        middle of a message as a header.  A frame that fails on an existing
+        connection is retried once on a fresh connection.
+
+        When the server cannot be reached, connection attempts back off
+        exponentially from reconnect_delay up to max_reconnect_delay
+        seconds.  Frames sent in between fail right away instead of each
+        waiting for a connect timeout, except frames sent with
+        reliable=True, which always try to connect.
+
+        get_stats() reports the send counters and the per-frame send latency
+        over the last stats_window frames.
+
         A connection is not established during __init__.  To check if a
         connection will succeed, use can_connect().
 
@@ -72,13 +184,33 @@ class Client(object):
 
         self._socket = None  # will be None when we're not connected
 
+        self._udp = udp
+        self._udp_port = self._port if udp_port is None else int(udp_port)
+        self._udp_socket = None  # created on the first datagram
+
+        self._send_buffer_size = send_buffer_size
+        self._min_reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._reconnect_delay = reconnect_delay
+        self._next_connect_time = 0.0  # no connection attempts before this
+        self._latencies = collections.deque(maxlen=stats_window)
+
+        self.frames_sent = 0
+        self.frames_failed = 0
+        self.retries = 0      # frames resent on a new connection
+        self.reconnects = 0   # connections made after the first one
+        self._connections = 0
+
     def _debug(self, m):
         if self.verbose:
             print('    %s' % str(m))
 
-    def _ensure_connected(self):
+    def _ensure_connected(self, force=False):
         """Set up a connection if one doesn't already exist.
 
+        Unless force is True, no attempt is made while backing off after a
+        failed attempt.
+
         Return True on success or False on failure.
 
         """
@@ -86,25 +218,47 @@ class Client(object):
             self._debug('_ensure_connected: already connected, doing nothing')
             return True
 
+        now = time.monotonic()
+        if not force and now < self._next_connect_time:
+            self._debug('_ensure_connected: backing off, not trying to connect')
+            return False
+
         try:
             self._debug('_ensure_connected: trying to connect...')
             self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._socket.settimeout(1)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self._send_buffer_size:
+                self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self._send_buffer_size)
             self._socket.connect((self._ip, self._port))
-            self._debug('_ensure_connected:    ...success')
-            return True
         except socket.error:
-            self._debug('_ensure_connected:    ...failure')
-            self._socket = None
+            self._debug('_ensure_connected:    ...failure, retrying in %.1f s' % self._reconnect_delay)
+            self._close_socket()
+            self._next_connect_time = now + self._reconnect_delay
+            self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
             return False
 
-    def disconnect(self):
-        """Drop the connection to the server, if there is one."""
-        self._debug('disconnecting')
+        self._debug('_ensure_connected:    ...success')
+        self._reconnect_delay = self._min_reconnect_delay
+        self._next_connect_time = 0.0
+        if self._connections:
+            self.reconnects += 1
+        self._connections += 1
+        return True
+
+    def _close_socket(self):
         if self._socket:
             self._socket.close()
         self._socket = None
 
+    def disconnect(self):
+        """Drop the connection to the server, if there is one."""
+        self._debug('disconnecting')
+        self._close_socket()
+        if self._udp_socket:
+            self._udp_socket.close()
+        self._udp_socket = None
+
     def can_connect(self):
         """Try to connect to the server.
 
@@ -114,12 +268,12 @@ class Client(object):
         subsequent put_pixels calls.
 
         """
-        success = self._ensure_connected()
+        success = self._ensure_connected(force=True)
         if not self._long_connection:
             self.disconnect()
         return success
 
-    def put_pixels(self, pixels, channel=0):
+    def put_pixels(self, pixels, channel=0, reliable=False):
         """Send the list of pixel colors to the OPC server on the given channel.
 
         channel: Which strand of lights to send the pixel colors to.
@@ -131,6 +285,11 @@ class Client(object):
             For example: [(255, 255, 255), (0, 0, 0), (127, 0, 0)]
             Floats will be rounded down to integers.
             Values outside the legal range will be clamped.
+            An (N, 3) numpy array or a buffer of packed rgb bytes is also
+            accepted (see encode_pixels).
+
+        reliable: In udp mode, send this frame over TCP instead of UDP.
+            Also try to connect even while backing off after a failure.
 
         Will establish a connection to the server as needed.
 
@@ -142,36 +301,693 @@ class Client(object):
         LED at a time (unless it's the first one).
 
         """
-        self._debug('put_pixels: connecting')
-        is_connected = self._ensure_connected()
-        if not is_connected:
-            self._debug('put_pixels: not connected.  ignoring these pixels.')
+        # build OPC message
+        payload = encode_pixels(pixels)
+        header = struct.pack('>BBH', channel, SET_PIXEL_COLOURS, len(payload))
+
+        return self._send_message(header + payload, 'put_pixels', reliable)
+
+    def put_frames(self, frames, reliable=False):
+        """Send pixel colors for several channels at once.
+
+        frames: A dict of {channel: pixels}, or a list of (channel, pixels)
+            pairs, where pixels is anything put_pixels() accepts.
+
+        The OPC messages for all channels are sent together with a single
+        system call (see send_frames()), so the strips update in lockstep.
+
+        Return True on success or False on failure.
+
+        """
+        if isinstance(frames, dict):
+            frames = frames.items()
+
+        messages = []
+        for channel, pixels in frames:
+            payload = encode_pixels(pixels)
+            messages.append(struct.pack('>BBH', channel, SET_PIXEL_COLOURS, len(payload)) + payload)
+
+        return self._send_messages(messages, 'put_frames', reliable)
+
+    def send_frames(self, frames, reliable=False):
+        """Send several FrameBuffers at once without copying them.
+
+        Over TCP all messages go out with one sendmsg() call (scatter-gather,
+        so the buffers are not joined first).  In udp mode every message is
+        its own datagram, as OPC servers expect one message per datagram.
+
+        Return True on success or False on failure.
+
+        """
+        return self._send_messages([frame.data for frame in frames], 'send_frames', reliable)
+
+    def frame_buffer(self, num_pixels, channel=0):
+        """Return a preallocated FrameBuffer for num_pixels on the given channel.
+
+        Write pixel values into the returned object and transmit it with
+        send_frame().  The same buffer can be reused for every frame.
+
+        """
+        return FrameBuffer(num_pixels, channel)
+
+    def send_frame(self, frame, reliable=False):
+        """Send a FrameBuffer to the OPC server without copying it.
+
+        reliable: In udp mode, send this frame over TCP instead of UDP.
+            Also try to connect even while backing off after a failure.
+
+        Will establish a connection to the server as needed.
+
+        On successful transmission of pixels, return True.
+        On failure (bad connection), return False.
+
+        """
+        return self._send_message(frame.data, 'send_frame', reliable)
+
+    def _send_message(self, message, caller, reliable=False):
+        """Send a complete OPC message (header and payload) to the server.
+
+        Return True on success or False on failure.
+
+        """
+        return self._send_messages([message], caller, reliable)
+
+    def _send_messages(self, messages, caller, reliable=False):
+        """Send a list of complete OPC messages to the server together.
+
+        Return True on success or False on failure.
+
+        """
+        start_time = time.monotonic()
+
+        if self._udp and not reliable and all(len(m) <= MAX_UDP_MESSAGE for m in messages):
+            if not all([self._send_datagram(message, caller) for message in messages]):
+                self.frames_failed += 1
+                return False
+
+            self._latencies.append(time.monotonic() - start_time)
+            self.frames_sent += 1
+            return True
+
+        # A connection that was already open may have been closed by the
+        # server since the last frame; then retry once on a new connection
+        retry = self._socket is not None
+
+        while True:
+            self._debug('%s: connecting' % caller)
+            if not self._ensure_connected(force=reliable):
+                self._debug('%s: not connected.  ignoring these pixels.' % caller)
+                self.frames_failed += 1
+                return False
+
+            self._debug('%s: sending pixels to server' % caller)
+            try:
+                self._send_all(messages)
+                break
+            except socket.error:
+                # Part of a message may have been written, so the stream can
+                # only be resynchronized on a new connection
+                self._debug('%s: connection lost.  could not send pixels.' % caller)
+                self._close_socket()
+                if not retry:
+                    self.frames_failed += 1
+                    return False
+                retry = False
+                self.retries += 1
+
+        self._latencies.append(time.monotonic() - start_time)
+        self.frames_sent += 1
+
+        if not self._long_connection:
+            self._debug('%s: disconnecting' % caller)
+            self.disconnect()
+
+        return True
+
+    def _send_all(self, messages):
+        """Write all messages to the socket, handling short writes.
+
+        Raise socket.error if the connection fails part way.
+
+        """
+        if len(messages) == 1:
+            self._socket.sendall(messages[0])
+            return
+
+        # One scatter-gather call; finish whatever it did not take
+        sent = self._socket.sendmsg(messages) if hasattr(self._socket, 'sendmsg') else 0
+        if sent < sum(len(m) for m in messages):
+            self._socket.sendall(b''.join(messages)[sent:])
+
+    def get_stats(self):
+        """Return a dict with frames_sent, frames_failed, retries,
+        reconnects, latency_ms (mean time to send a frame, over TCP or as
+        datagrams) and max_latency_ms, over the last frames sent.
+
+        The latencies are None until a frame has been sent.
+
+        """
+        latencies = list(self._latencies)
+        latency_ms = None
+        max_latency_ms = None
+        if latencies:
+            latency_ms = statistics.mean(latencies) * 1000.0
+            max_latency_ms = max(latencies) * 1000.0
+        return {'frames_sent': self.frames_sent,
+                'frames_failed': self.frames_failed,
+                'retries': self.retries,
+                'reconnects': self.reconnects,
+                'latency_ms': latency_ms,
+                'max_latency_ms': max_latency_ms}
+
+    def _send_datagram(self, message, caller):
+        """Send a complete OPC message to the server as one UDP datagram.
+
+        Return True on success or False on failure.
+
+        """
+        try:
+            if not self._udp_socket:
+                self._udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._debug('%s: sending datagram to server' % caller)
+            self._udp_socket.sendto(message, (self._ip, self._udp_port))
+        except socket.error:
+            self._debug('%s: could not send datagram.' % caller)
+            if self._udp_socket:
+                self._udp_socket.close()
+            self._udp_socket = None
             return False
 
-        # build OPC message
-        command = SET_PIXEL_COLOURS
-        header = struct.pack('>BBH', channel, SET_PIXEL_COLOURS, len(pixels)*3)
-        pieces = [struct.pack(
-                      'BBB',
-                      min(255, max(0, int(r))),
-                      min(255, max(0, int(g))),
-                      min(255, max(0, int(b)))
-                  ) for r, g, b in pixels]
-        if bytes is str:
-            message = header + ''.join(pieces)
+        return True
+
+
+class FrameBuffer(object):
+    def __init__(self, num_pixels, channel=0):
+        """Create a reusable OPC message for num_pixels on the given channel.
+
+        The whole message (4 byte header followed by r, g, b bytes for each
+        pixel) lives in one preallocated bytearray, self.data, which is what
+        Client.send_frame() transmits.
+
+        The pixel payload can be written in place through:
+        * self.pixels: a memoryview of the payload bytes.
+        * self.array: an (num_pixels, 3) uint8 numpy view of the payload,
+          or None if numpy is not available.
+
+        """
+        if not 0 <= num_pixels * 3 <= 0xFFFF:
+            raise ValueError('num_pixels must be between 0 and %d' % (0xFFFF // 3))
+
+        self.num_pixels = num_pixels
+        self.channel = channel
+
+        self.data = bytearray(4 + num_pixels * 3)
+        struct.pack_into('>BBH', self.data, 0, channel, SET_PIXEL_COLOURS, num_pixels * 3)
+        self.pixels = memoryview(self.data)[4:]
+
+        if numpy is not None:
+            self.array = numpy.frombuffer(self.data, dtype=numpy.uint8, offset=4).reshape(num_pixels, 3)
+        else:
+            self.array = None
+
+    def set_pixel(self, index, color):
+        """Set the pixel at index to an (r, g, b) color."""
+        offset = index * 3
+        self.pixels[offset:offset + 3] = bytes(bytearray(min(255, max(0, int(value))) for value in color))
+
+    def fill(self, color):
+        """Set every pixel to the same (r, g, b) color."""
+        if self.array is not None:
+            self.array[:] = [min(255, max(0, int(value))) for value in color]
         else:
-            message = header + b''.join(pieces)
+            self.pixels[:] = bytes(bytearray(min(255, max(0, int(value))) for value in color)) * self.num_pixels
+
+    def set_pixels(self, pixels):
+        """Copy a whole frame (any form accepted by encode_pixels) into the buffer."""
+        self.pixels[:] = encode_pixels(pixels)
+
+
+class AsyncClient(object):
+    def __init__(self, server_ip_port, max_queued_frames=1, timeout=1.0,
+                 reconnect_delay=1.0, verbose=False):
+        """Create an asyncio OPC client which sends pixels from a background task.
 
-        self._debug('put_pixels: sending pixels to server')
+        server_ip_port should be an ip:port or hostname:port as a single string.
+        For example: '127.0.0.1:7890' or 'localhost:7890'
+
+        put_pixels() and send_frame() only encode the frame and place it in a
+        bounded outgoing queue; they never wait on the network.  When the
+        queue holds max_queued_frames frames, the oldest one is dropped in
+        favor of the newest.  A background task started by start() writes
+        queued frames to the server, and if the connection is lost or the
+        server stalls for longer than timeout seconds it reconnects every
+        reconnect_delay seconds until the server is back.
+
+        put_pixels(), send_frame() and start() must be called from the thread
+        running the event loop.
+
+        If verbose is True, the client will print debugging info to the console.
+
+        """
+        self.verbose = verbose
+
+        self._ip, self._port = server_ip_port.split(':')
+        self._port = int(self._port)
+
+        self._timeout = timeout
+        self._reconnect_delay = reconnect_delay
+
+        self._queue = collections.deque(maxlen=max_queued_frames)
+        self._wakeup = asyncio.Event()
+        self._writer = None  # will be None when we're not connected
+        self._task = None
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def _debug(self, m):
+        if self.verbose:
+            print('    %s' % str(m))
+
+    def is_connected(self):
+        """Return True if the background task currently has a connection."""
+        return self._writer is not None
+
+    def start(self):
+        """Start the background sender task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    async def close(self):
+        """Stop the background sender task and drop the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+
+    def put_pixels(self, pixels, channel=0):
+        """Queue the list of pixel colors for the given channel.
+
+        Takes the same arguments as Client.put_pixels().  Returns immediately.
+
+        """
+        payload = encode_pixels(pixels)
+        header = struct.pack('>BBH', channel, SET_PIXEL_COLOURS, len(payload))
+        self._enqueue(header + payload)
+
+    def send_frame(self, frame):
+        """Queue a snapshot of a FrameBuffer.  Returns immediately."""
+        self._enqueue(bytes(frame.data))
+
+    def put_frames(self, frames):
+        """Queue pixel colors for several channels as one frame.
+
+        Takes the same arguments as Client.put_frames().  The messages are
+        written together, so the strips update in lockstep.  Returns
+        immediately.
+
+        """
+        if isinstance(frames, dict):
+            frames = frames.items()
+
+        messages = []
+        for channel, pixels in frames:
+            payload = encode_pixels(pixels)
+            messages.append(struct.pack('>BBH', channel, SET_PIXEL_COLOURS, len(payload)) + payload)
+        self._enqueue(b''.join(messages))
+
+    def _enqueue(self, message):
+        if len(self._queue) == self._queue.maxlen:
+            self.frames_dropped += 1
+        self._queue.append(message)
+        self._wakeup.set()
+
+    async def _connect(self):
+        """Try to connect to the server.  Return True on success."""
         try:
-            self._socket.send(message)
-        except socket.error:
-            self._debug('put_pixels: connection lost.  could not send pixels.')
-            self._socket = None
+            self._debug('_connect: trying to connect...')
+            _, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._ip, self._port), self._timeout)
+            self._debug('_connect:    ...success')
+            return True
+        except (OSError, asyncio.TimeoutError):
+            self._debug('_connect:    ...failure')
+            self._writer = None
             return False
 
-        if not self._long_connection:
-            self._debug('put_pixels: disconnecting')
-            self.disconnect()
+    async def _disconnect(self):
+        if self._writer is not None:
+            self._debug('disconnecting')
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._writer = None
+
+    async def _run(self):
+        """Background task: connect as needed and write out queued frames."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            if self._writer is None and not await self._connect():
+                await asyncio.sleep(self._reconnect_delay)
+                self._wakeup.set()
+                continue
+
+            try:
+                while self._queue:
+                    self._writer.write(self._queue.popleft())
+                    await asyncio.wait_for(self._writer.drain(), self._timeout)
+                    self.frames_sent += 1
+            except (OSError, asyncio.TimeoutError):
+                self._debug('_run: connection lost.  could not send pixels.')
+                self._writer.transport.abort()
+                self._writer = None
+                self._wakeup.set()
+
+
+class FrameScheduler(threading.Thread):
+    def __init__(self, client, fps=30, stats_window=100):
+        """Create a thread which sends frames to client at no more than fps.
+
+        put_pixels() and send_frame() only record the frame as pending for its
+        channel and return immediately.  Frames that arrive for the same
+        channel within one frame interval are coalesced, so only the latest
+        one is sent.  send_now() bypasses the rate limit for frames that must
+        go out right away (e.g. turning the strip off).
+
+        A frame identical to the last one delivered on its channel is
+        skipped.  Frames are only remembered as delivered once the client
+        reports success; a frame that fails is kept pending (unless a newer
+        one replaces it) and retried every frame interval.  last_sent()
+        returns what was last delivered on a channel.
+
+        get_stats() reports the achieved frame rate and the frame-time jitter
+        over the last stats_window frames.
+
+        Call start() to begin sending and cleanup() to send any pending frames
+        and stop the thread.
 
-        return True
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self._client = client
+        self._interval = 1.0 / fps
+
+        self._pending = {}  # channel -> packed rgb payload
+        self._sent = {}  # channel -> payload last delivered
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()  # serializes use of the client
+        self._new_frame = threading.Event()
+        self._stop_event = threading.Event()
+
+        self._last_send_time = None
+        self._intervals = collections.deque(maxlen=stats_window)
+
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.frames_skipped = 0
+        self.frames_failed = 0
+
+    def put_pixels(self, pixels, channel=0):
+        """Schedule the list of pixel colors for the given channel."""
+        self._schedule(channel, encode_pixels(pixels))
+
+    def send_frame(self, frame):
+        """Schedule a snapshot of a FrameBuffer."""
+        self._schedule(frame.channel, bytes(frame.pixels))
+
+    def send_now(self, frame, reliable=False):
+        """Send a FrameBuffer immediately, replacing any pending frame for its
+        channel.  Return the result of Client.send_frame().
+
+        """
+        with self._lock:
+            self._pending.pop(frame.channel, None)
+        with self._send_lock:
+            success = self._client.send_frame(frame, reliable=reliable)
+        with self._lock:
+            if success:
+                self._sent[frame.channel] = bytes(frame.pixels)
+            else:
+                self._sent.pop(frame.channel, None)
+        return success
+
+    def last_sent(self, channel=0):
+        """Return the payload last delivered on channel, or None if nothing
+        was delivered or the last attempt failed.
+
+        """
+        with self._lock:
+            return self._sent.get(channel)
+
+    def _schedule(self, channel, payload):
+        with self._lock:
+            if channel in self._pending:
+                self.frames_coalesced += 1
+            self._pending[channel] = payload
+        self._new_frame.set()
+
+    def get_stats(self):
+        """Return a dict with frames_sent, frames_coalesced, frames_skipped,
+        frames_failed, fps (achieved frame rate) and jitter_ms (standard
+        deviation of the frame interval).
+
+        fps and jitter_ms only use intervals where a frame was already
+        waiting for its slot, so idle time between updates does not count.
+        They are None until enough such frames have been sent.
+
+        """
+        intervals = list(self._intervals)
+        fps = None
+        jitter_ms = None
+        if intervals:
+            fps = 1.0 / statistics.mean(intervals)
+        if len(intervals) > 1:
+            jitter_ms = statistics.pstdev(intervals) * 1000.0
+        return {'frames_sent': self.frames_sent,
+                'frames_coalesced': self.frames_coalesced,
+                'frames_skipped': self.frames_skipped,
+                'frames_failed': self.frames_failed,
+                'fps': fps,
+                'jitter_ms': jitter_ms}
+
+    def run(self):
+        """Run the scheduler thread.  Send pending frames at most every
+        frame interval until told to stop.
+
+        """
+        next_send_time = time.monotonic()
+
+        while not self._stop_event.is_set():
+            self._new_frame.wait()
+
+            # Wait out the rest of the frame interval; new frames arriving in
+            # the meantime replace the pending ones
+            delay = next_send_time - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+            self._new_frame.clear()
+            next_send_time = max(next_send_time, time.monotonic()) + self._interval
+            self._flush(busy=delay > 0)
+
+        # Do not lose the last frame on shutdown
+        self._flush()
+
+    def _flush(self, busy=False):
+        """Send the pending frames.  busy is True if they waited for the
+        frame interval (i.e. the scheduler is running at its rate limit).
+
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+
+            # Skip channels whose frame is already on the strip
+            for channel in list(pending):
+                if pending[channel] == self._sent.get(channel):
+                    del pending[channel]
+                    self.frames_skipped += 1
+
+        if not pending:
+            return
+
+        # All channels of the frame go out together
+        with self._send_lock:
+            success = self._client.put_frames(pending)
+
+        with self._lock:
+            if success:
+                self._sent.update(pending)
+            else:
+                # Retry on the next frame interval unless replaced by then
+                for channel, payload in pending.items():
+                    self._sent.pop(channel, None)
+                    self._pending.setdefault(channel, payload)
+
+        if not success:
+            self.frames_failed += 1
+            self._new_frame.set()
+            return
+
+        now = time.monotonic()
+        if busy and self._last_send_time is not None:
+            self._intervals.append(now - self._last_send_time)
+        self._last_send_time = now
+        self.frames_sent += 1
+
+    def cleanup(self):
+        """Send any pending frames and stop the scheduler thread."""
+        self._stop_event.set()
+        self._new_frame.set()
+        if self.is_alive():
+            self.join()
+
+
+class Ditherer(threading.Thread):
+    def __init__(self, client, num_pixels, channel=0, fps=60):
+        """Create a thread which temporally dithers a high precision frame
+        down to 8 bits and sends it to client (a Client or a FrameScheduler)
+        at fps.
+
+        set_pixels() and fill() set the target frame as floats on the 0-255
+        scale.  Every output frame is the target plus the rounding error
+        carried over from the previous frames, rounded half up to 8 bits,
+        and the new rounding error is kept per pixel and channel.  Averaged
+        over a few frames the strip shows the fractional levels.  Setting a
+        new target clears the carried error.
+
+        Frames identical to the last one sent are skipped, and when the
+        target has only whole levels (and no error is left to carry) the
+        thread sleeps until a new target is set.
+
+        The target and error frames are numpy arrays when numpy is available
+        and flat lists of floats otherwise.
+
+        Call start() to begin sending and cleanup() to send the last frame
+        and stop the thread.
+
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self._client = client
+        self._interval = 1.0 / fps
+        self._frame = FrameBuffer(num_pixels, channel)
+        self._last_payload = None
+        self._fractional = False  # target has levels between the 8-bit steps
+
+        if numpy is not None:
+            self._target = numpy.zeros((num_pixels, 3))
+            self._error = numpy.zeros((num_pixels, 3))
+        else:
+            self._target = [0.0] * (num_pixels * 3)
+            self._error = [0.0] * (num_pixels * 3)
+
+        self._lock = threading.Lock()
+        self._new_target = threading.Event()
+        self._stop_event = threading.Event()
+
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    def set_pixels(self, pixels):
+        """Set the target frame from a list of (r, g, b) floats or an
+        (N, 3) array.
+
+        """
+        if numpy is not None:
+            target = numpy.clip(numpy.asarray(pixels, dtype=float).reshape(-1, 3), 0, 255)
+            fractional = bool((numpy.abs(target - numpy.floor(target + 0.5)) > DITHER_TOLERANCE).any())
+            error = numpy.zeros(target.shape)
+        else:
+            target = [min(255.0, max(0.0, float(value))) for pixel in pixels for value in pixel]
+            fractional = any(abs(value - math.floor(value + 0.5)) > DITHER_TOLERANCE for value in target)
+            error = [0.0] * len(target)
+
+        # The error carried for the old target would otherwise keep
+        # alternating around a whole-level target
+        with self._lock:
+            self._target = target
+            self._error = error
+            self._fractional = fractional
+        self._new_target.set()
+
+    def fill(self, color):
+        """Set every pixel of the target frame to the same (r, g, b) floats."""
+        self.set_pixels([color] * self._frame.num_pixels)
+
+    def render(self):
+        """Compute the next 8-bit frame into the FrameBuffer and return it.
+
+        Return True if more frames are needed to show the target (it has
+        fractional levels or some rounding error is still being carried).
+
+        """
+        with self._lock:
+            if numpy is not None:
+                total = self._target + self._error
+                output = numpy.clip(numpy.floor(total + 0.5), 0, 255)
+                self._error = total - output
+                self._frame.array[:] = output
+                return self._fractional or bool((numpy.abs(self._error) > DITHER_TOLERANCE).any())
+
+            output = bytearray(len(self._target))
+            for i, target in enumerate(self._target):
+                total = target + self._error[i]
+                value = min(255, max(0, int(math.floor(total + 0.5))))
+                self._error[i] = total - value
+                output[i] = value
+            self._frame.pixels[:] = output
+            return self._fractional or any(abs(error) > DITHER_TOLERANCE for error in self._error)
+
+    def _send(self):
+        payload = bytes(self._frame.pixels)
+        if payload == self._last_payload:
+            self.frames_skipped += 1
+            return
+        if self._client.send_frame(self._frame) is False:
+            # Send it again next time even if it has not changed
+            self._last_payload = None
+            return
+        self._last_payload = payload
+        self.frames_sent += 1
+
+    def run(self):
+        """Run the dither thread.  Send a frame every frame interval while
+        there is error to spread, then wait for a new target.
+
+        """
+        next_send_time = time.monotonic()
+
+        while not self._stop_event.is_set():
+            self._new_target.clear()
+            dithering = self.render()
+            self._send()
+
+            if not dithering:
+                self._new_target.wait()
+
+            # Keep a steady frame rate; do not try to catch up after a stall
+            next_send_time = max(next_send_time + self._interval, time.monotonic())
+            delay = next_send_time - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+    def cleanup(self):
+        """Stop the dither thread and send the last frame."""
+        self._stop_event.set()
+        self._new_target.set()
+        if self.is_alive():
+            self.join()
+        self.render()
+        self._send()
@@ -0,0 +1,350 @@
+"""
+--------------------------------------------------------------------------
+LED Strip Pixels
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+LED Strip Pixels
+
+  Pixel level model of an LED strip, backed by an (N, 3) numpy array of 
+colors.  Pixels can be set one at a time, by slice, by named segment, or 
+with a gradient, all as numpy operations.  Each segment can have its own 
+brightness.
+
+  render() turns the colors into the frame sent to the strip with a 
+vectorized gather from the cached byte tables of a ColorLUT (see 
+color_lut.py), which combine gamma, white point and brightness:  one 
+gather for the strip and one per segment with its own brightness, with no
+per-pixel math.  show() renders straight into the payload of an 
+opc.FrameBuffer and hands it to the client, so no tuples or lists are built.
+render_exact() gathers the float curve instead, for the ditherer.
+
+  Requires numpy.
+
+Software API:
+
+  PixelStrip(num_pixels, lut=None, brightness=255)
+    - Provide the number of pixels and optionally the ColorLUT (None = no
+      correction)
+    
+    pixels
+      - (num_pixels, 3) uint8 array of colors.  Indexing the strip indexes
+        this array, e.g. strip[0] = (255, 0, 0); strip[10:20] = (0, 0, 255)
+
+    brightness
+      - Brightness (0 - 255) of the pixels that are not in a segment with
+        its own brightness
+    
+    fill(color)
+      - Set every pixel to the color
+
+    gradient(start_color, end_color, start=0, stop=None)
+      - Blend the pixels from start to stop (exclusive) from start_color to
+        end_color
+
+    add_segment(name, start, stop, brightness=None)
+      - Add a named segment of pixels [start, stop) and return it.  A 
+        Segment has pixels, brightness (None = strip brightness), fill() and
+        gradient(start_color, end_color).  Segments are also available as 
+        strip.segments[name].
+
+    render(out=None)
+      - Return the corrected (num_pixels, 3) uint8 frame (written to "out"
+        if given, e.g. FrameBuffer.array), gathered from the ColorLUT tables
+
+    render_exact()
+      - Return the corrected frame as floats, before rounding to 8 bits 
+        (e.g. for opc.Ditherer)
+
+    show(client, channel=0)
+      - Render into a FrameBuffer and send it with client.send_frame()
+
+"""
+import collections
+
+import numpy
+
+import color_lut
+import opc
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MAX_BRIGHTNESS              = 255
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def blend(start_color, end_color, count):
+    """ Return a (count, 3) uint8 array blending start_color to end_color """
+    t     = numpy.linspace(0.0, 1.0, count)[:, None]
+    start = numpy.asarray(start_color, dtype=float)
+    end   = numpy.asarray(end_color, dtype=float)
+    
+    return numpy.rint(start + (end - start) * t).astype(numpy.uint8)
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class Segment():
+    """ Named range of pixels of a PixelStrip """
+    name            = None
+    start           = None
+    stop            = None
+    pixels          = None   # view of the strip pixels
+    brightness      = None   # None = strip brightness
+    
+    def __init__(self, strip, name, start, stop, brightness=None):
+        """ Initialize the segment """
+        self.name       = name
+        self.start      = start
+        self.stop       = stop
+        self.pixels     = strip.pixels[start:stop]
+        self.brightness = brightness
+    
+    # End def
+    
+    
+    def fill(self, color):
+        """ Set every pixel of the segment to the color """
+        self.pixels[:] = color
+    
+    # End def
+    
+    
+    def gradient(self, start_color, end_color):
+        """ Blend the segment from start_color to end_color """
+        self.pixels[:] = blend(start_color, end_color, len(self.pixels))
+    
+    # End def
+
+# End class
+
+
+class PixelStrip():
+    """ Pixel level LED strip model """
+    num_pixels      = None
+    pixels          = None   # (num_pixels, 3) uint8 colors
+    brightness      = None
+    segments        = None   # name -> Segment, in the order added
+    lut             = None   # ColorLUT
+    curve           = None   # (3, 256) light output at full brightness
+    sources         = None   # input channel of each output channel
+    tables          = None   # brightness -> the 3 tables as one (768,) uint8 array
+    offsets         = None   # start of each output channel's table
+    frame           = None   # opc.FrameBuffer used by show()
+    
+    def __init__(self, num_pixels, lut=None, brightness=MAX_BRIGHTNESS):
+        """ Initialize the pixels and the output curve """
+        self.num_pixels = num_pixels
+        self.pixels     = numpy.zeros((num_pixels, 3), dtype=numpy.uint8)
+        self.brightness = brightness
+        self.segments   = collections.OrderedDict()
+        
+        if lut is None:
+            lut = color_lut.ColorLUT()
+        
+        # Light output of each channel for each 8-bit value at full 
+        # brightness; render_exact() scales it by the brightness of each pixel
+        self.lut     = lut
+        self.curve   = numpy.array(lut.curve)
+        self.sources = numpy.array(lut.sources)
+        self.tables  = {}
+        self.offsets = numpy.arange(3) * 256
+    
+    # End def
+    
+    
+    def __len__(self):
+        return self.num_pixels
+    
+    # End def
+    
+    
+    def __getitem__(self, index):
+        return self.pixels[index]
+    
+    # End def
+    
+    
+    def __setitem__(self, index, color):
+        self.pixels[index] = color
+    
+    # End def
+    
+    
+    def fill(self, color):
+        """ Set every pixel to the color """
+        self.pixels[:] = color
+    
+    # End def
+    
+    
+    def gradient(self, start_color, end_color, start=0, stop=None):
+        """ Blend the pixels [start, stop) from start_color to end_color """
+        if stop is None:
+            stop = self.num_pixels
+        
+        self.pixels[start:stop] = blend(start_color, end_color, stop - start)
+    
+    # End def
+    
+    
+    def add_segment(self, name, start, stop, brightness=None):
+        """ Add a named segment of pixels [start, stop) and return it """
+        if not (0 <= start < stop <= self.num_pixels):
+            raise ValueError("Segment {0} [{1}, {2}) is not on the strip".format(name, start, stop))
+        
+        self.segments[name] = Segment(self, name, start, stop, brightness)
+        
+        return self.segments[name]
+    
+    # End def
+    
+    
+    def _levels(self):
+        """ Return the brightness of every pixel as an (N, 1) array """
+        levels = numpy.full((self.num_pixels, 1), float(self.brightness))
+        
+        # Segments added later win where segments overlap
+        for segment in self.segments.values():
+            if segment.brightness is not None:
+                levels[segment.start:segment.stop] = segment.brightness
+        
+        return numpy.clip(levels, 0, MAX_BRIGHTNESS)
+    
+    # End def
+    
+    
+    def render_exact(self):
+        """ Return the corrected frame as an (N, 3) float array """
+        # One gather for every pixel and channel, then scale by brightness
+        return self.curve[numpy.arange(3), self.pixels[:, self.sources]] * self._levels()
+    
+    # End def
+    
+    
+    def _table(self, brightness):
+        """ Return the three tables of the ColorLUT for the brightness as one
+        (768,) uint8 array (indexed by value + offsets) """
+        brightness = max(0, min(MAX_BRIGHTNESS, int(round(brightness))))
+        
+        if brightness not in self.tables:
+            self.tables[brightness] = numpy.frombuffer(b"".join(self.lut.table(brightness)), 
+                                                       dtype=numpy.uint8)
+        
+        return self.tables[brightness]
+    
+    # End def
+    
+    
+    def render(self, out=None):
+        """ Return the corrected frame as an (N, 3) uint8 array """
+        if out is None:
+            out = numpy.empty((self.num_pixels, 3), dtype=numpy.uint8)
+        
+        indexes = self.pixels[:, self.sources] + self.offsets
+        
+        # One gather for the strip, then one per segment with its own 
+        # brightness (segments added later win where segments overlap)
+        numpy.take(self._table(self.brightness), indexes, out=out)
+        
+        for segment in self.segments.values():
+            if segment.brightness is not None:
+                numpy.take(self._table(segment.brightness), indexes[segment.start:segment.stop],
+                           out=out[segment.start:segment.stop])
+        
+        return out
+    
+    # End def
+    
+    
+    def show(self, client, channel=0):
+        """ Render into a FrameBuffer and send it with client.send_frame() """
+        if (self.frame is None) or (self.frame.channel != channel):
+            self.frame = opc.FrameBuffer(self.num_pixels, channel)
+        
+        self.render(out=self.frame.array)
+        
+        return client.send_frame(self.frame)
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    ADDRESS = 'localhost:7890'
+    
+    print("Pixel Strip Test")
+    
+    client = opc.Client(ADDRESS)
+    strip  = PixelStrip(240, lut=color_lut.ColorLUT.from_config(), brightness=128)
+    
+    # Sunrise scene:  warm gradient at the ends, dim blue in the middle
+    left   = strip.add_segment("left", 0, 80)
+    middle = strip.add_segment("middle", 80, 160, brightness=40)
+    right  = strip.add_segment("right", 160, 240)
+    
+    left.gradient((255, 60, 0), (255, 200, 120))
+    middle.fill((50, 50, 100))
+    right.gradient((255, 200, 120), (255, 60, 0))
+    
+    count = 1000
+    start = time.time()
+    for i in range(count):
+        strip.render()
+    print("render(): {0:.1f} us for {1} pixels".format((time.time() - start) / count * 1e6, len(strip)))
+    
+    if client.can_connect():
+        strip.show(client)
+    else:
+        print("WARNING: Could not connect to {0}".format(ADDRESS))
+    
+    print("Test Complete")
+
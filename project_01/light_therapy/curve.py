@@ -0,0 +1,351 @@
+"""
+--------------------------------------------------------------------------
+Light Therapy Curve
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Light Therapy Curve
+
+  A continuous time of day curve for the LED strip.  The curve is defined by
+keyframes (a time of day with a brightness and either an RGB color or a 
+color temperature in Kelvin).  Between two keyframes the brightness and 
+color are interpolated, and after the last keyframe of the day the curve 
+wraps around to the first.
+
+  Interpolation modes:
+    - "linear":  Straight line between the keyframes
+    - "cosine":  Eases in and out of each keyframe (no sudden change of 
+                 slope at the keyframes)
+    - "kelvin":  Interpolates the color temperature and converts it to RGB,
+                 so transitions follow the color of daylight / incandescent 
+                 light instead of cutting straight across the RGB cube.  
+                 Every keyframe must have a "kelvin" value.
+
+  The whole day is precomputed when the curve is created into compact 
+arrays with one entry every "step" seconds (1440 entries for step=60, 
+86400 for step=1):  "colors" holds packed RGB bytes and "brightness" one 
+byte per entry, so a lookup is a single index.  When numpy is available, 
+the arrays are computed with vectorized math and "array" is an (N, 3) 
+uint8 view of the colors.
+
+Software API:
+
+  Curve(keyframes, interpolation="cosine", step=60)
+    - keyframes is a list of dictionaries, e.g.
+        { "time": "06:00", "brightness": 100, "color": [255, 100, 0] }
+        { "time": "12:00", "brightness": 200, "kelvin": 6500 }
+      Brightness and color values are 0 - 255, and no two keyframes may 
+      have the same time.
+    - step is a whole number of seconds that divides a day evenly
+    
+    index(hour, minute=0, second=0)
+      - Return the array index for the time of day
+
+    lookup(hour, minute=0, second=0)
+      - Return (brightness, (R, G, B)) for the time of day
+
+  kelvin_to_rgb(kelvin)
+    - Return the (R, G, B) color of a color temperature
+
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+SECONDS_PER_DAY             = 24 * 60 * 60
+
+INTERPOLATIONS              = ("linear", "cosine", "kelvin")
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def kelvin_to_rgb(kelvin):
+    """ Return the (R, G, B) color of a color temperature (1000 K - 40000 K).
+    
+    Uses Tanner Helland's fit of the blackbody color table.
+    """
+    temp = min(max(kelvin, 1000), 40000) / 100.0
+    
+    if temp <= 66:
+        red   = 255.0
+        green = 99.4708025861 * math.log(temp) - 161.1195681661
+    else:
+        red   = 329.698727446 * math.pow(temp - 60, -0.1332047592)
+        green = 288.1221695283 * math.pow(temp - 60, -0.0755148492)
+    
+    if temp >= 66:
+        blue  = 255.0
+    elif temp <= 19:
+        blue  = 0.0
+    else:
+        blue  = 138.5177312231 * math.log(temp - 10) - 305.0447927307
+    
+    return tuple(min(max(c, 0.0), 255.0) for c in (red, green, blue))
+
+# End def
+
+
+def parse_time(value):
+    """ Return the second of the day for a "HH:MM" or "HH:MM:SS" string """
+    try:
+        parts = [int(part) for part in value.split(":")]
+        if len(parts) == 2:
+            parts.append(0)
+        hour, minute, second = parts
+    except (AttributeError, ValueError):
+        raise ValueError("Keyframe time {0!r} is not HH:MM[:SS]".format(value))
+    
+    if not ((0 <= hour < 24) and (0 <= minute < 60) and (0 <= second < 60)):
+        raise ValueError("Keyframe time {0!r} is out of range".format(value))
+    
+    return (hour * 60 + minute) * 60 + second
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class Curve():
+    """ Precomputed time of day brightness / color curve """
+    keyframes       = None   # [(seconds, brightness, (R, G, B), kelvin), ...]
+    interpolation   = None
+    step            = None
+    size            = None   # number of entries
+    colors          = None   # packed RGB bytes, 3 per entry
+    brightness      = None   # one byte per entry
+    array           = None   # (size, 3) numpy view of colors, or None
+    
+    def __init__(self, keyframes, interpolation="cosine", step=60):
+        """ Parse the keyframes and precompute the curve """
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError("Unknown interpolation {0!r}".format(interpolation))
+        
+        if (step <= 0) or (step != int(step)) or (SECONDS_PER_DAY % int(step) != 0):
+            raise ValueError("Curve step must be a whole number of seconds that divides a day evenly")
+        
+        if len(keyframes) == 0:
+            raise ValueError("Curve has no keyframes")
+        
+        self.interpolation = interpolation
+        self.step          = int(step)
+        self.size          = SECONDS_PER_DAY // self.step
+        self.keyframes     = sorted((self._parse_keyframe(k) for k in keyframes), 
+                                    key=lambda keyframe: keyframe[0])
+        
+        # Two keyframes at one time would make a segment that covers the day
+        for previous, keyframe in zip(self.keyframes, self.keyframes[1:]):
+            if keyframe[0] == previous[0]:
+                raise ValueError("Two keyframes at {0:02d}:{1:02d}:{2:02d}".format(
+                                 keyframe[0] // 3600, keyframe[0] // 60 % 60, keyframe[0] % 60))
+        
+        self.colors        = bytearray(self.size * 3)
+        self.brightness    = bytearray(self.size)
+        
+        if numpy is not None:
+            self.array = numpy.frombuffer(self.colors, dtype=numpy.uint8).reshape(self.size, 3)
+        
+        for i in range(len(self.keyframes)):
+            self._build_segment(self.keyframes[i], 
+                                self.keyframes[(i + 1) % len(self.keyframes)])
+    
+    # End def
+    
+    
+    def _parse_keyframe(self, keyframe):
+        """ Return (seconds, brightness, (R, G, B), kelvin) for a keyframe """
+        kelvin = keyframe.get("kelvin")
+        
+        if kelvin is not None:
+            color = kelvin_to_rgb(kelvin)
+        elif self.interpolation == "kelvin":
+            raise ValueError("Keyframe {0} has no kelvin value".format(keyframe["time"]))
+        else:
+            color = tuple(float(c) for c in keyframe["color"])
+        
+        brightness = float(keyframe["brightness"])
+        
+        if not (0 <= brightness <= 255):
+            raise ValueError("Keyframe {0} brightness {1} is not 0 - 255".format(keyframe["time"], brightness))
+        
+        if not all(0 <= c <= 255 for c in color):
+            raise ValueError("Keyframe {0} color {1} is not 0 - 255".format(keyframe["time"], color))
+        
+        return (parse_time(keyframe["time"]), brightness, color, kelvin)
+    
+    # End def
+    
+    
+    def _build_segment(self, start, end):
+        """ Fill the entries from the start keyframe up to the end keyframe """
+        start_time = start[0]
+        end_time   = end[0]
+        
+        # The last segment of the day wraps around midnight
+        if end_time <= start_time:
+            end_time += SECONDS_PER_DAY
+        
+        first = -(-start_time // self.step)   # ceiling division
+        last  = -(-end_time // self.step)
+        
+        if first >= last:
+            return
+        
+        if numpy is not None:
+            self._build_segment_numpy(start, end, start_time, end_time, first, last)
+            return
+        
+        for n in range(first, last):
+            t     = self._ease((n * self.step - start_time) / (end_time - start_time))
+            index = n % self.size
+            
+            self.brightness[index] = min(255, max(0, int(round(start[1] + (end[1] - start[1]) * t))))
+            
+            if self.interpolation == "kelvin":
+                color = kelvin_to_rgb(start[3] + (end[3] - start[3]) * t)
+            else:
+                color = [a + (b - a) * t for a, b in zip(start[2], end[2])]
+            
+            self.colors[index * 3:index * 3 + 3] = bytes(min(255, max(0, int(round(c)))) for c in color)
+    
+    # End def
+    
+    
+    def _build_segment_numpy(self, start, end, start_time, end_time, first, last):
+        """ Vectorized version of _build_segment() """
+        n     = numpy.arange(first, last)
+        t     = self._ease((n * self.step - start_time) / float(end_time - start_time))
+        index = n % self.size
+        
+        brightness = start[1] + (end[1] - start[1]) * t
+        numpy.frombuffer(self.brightness, dtype=numpy.uint8)[index] = \
+            numpy.clip(numpy.rint(brightness), 0, 255).astype(numpy.uint8)
+        
+        if self.interpolation == "kelvin":
+            color  = self._kelvin_to_rgb_numpy(start[3] + (end[3] - start[3]) * t)
+        else:
+            a      = numpy.array(start[2])
+            b      = numpy.array(end[2])
+            color  = a + (b - a) * t[:, None]
+        
+        self.array[index] = numpy.clip(numpy.rint(color), 0, 255).astype(numpy.uint8)
+    
+    # End def
+    
+    
+    def _ease(self, t):
+        """ Map the position between two keyframes (0 - 1) to the blend """
+        if self.interpolation == "cosine":
+            if numpy is not None and isinstance(t, numpy.ndarray):
+                return (1 - numpy.cos(numpy.pi * t)) / 2
+            return (1 - math.cos(math.pi * t)) / 2
+        
+        return t
+    
+    # End def
+    
+    
+    def _kelvin_to_rgb_numpy(self, kelvin):
+        """ Vectorized version of kelvin_to_rgb(); returns an (N, 3) array """
+        temp = numpy.clip(kelvin, 1000, 40000) / 100.0
+        warm = temp <= 66
+        
+        # Clamp the arguments so the branch that is not used stays finite
+        red   = numpy.where(warm, 255.0, 
+                            329.698727446 * numpy.power(numpy.maximum(temp - 60, 1), -0.1332047592))
+        green = numpy.where(warm, 
+                            99.4708025861 * numpy.log(temp) - 161.1195681661,
+                            288.1221695283 * numpy.power(numpy.maximum(temp - 60, 1), -0.0755148492))
+        blue  = numpy.where(temp >= 66, 255.0, 
+                            numpy.where(temp <= 19, 0.0, 
+                                        138.5177312231 * numpy.log(numpy.maximum(temp - 10, 1)) - 305.0447927307))
+        
+        return numpy.clip(numpy.stack([red, green, blue], axis=1), 0, 255)
+    
+    # End def
+    
+    
+    def index(self, hour, minute=0, second=0):
+        """ Return the entry index for the time of day """
+        return (((hour * 60 + minute) * 60 + second) // self.step) % self.size
+    
+    # End def
+    
+    
+    def lookup(self, hour, minute=0, second=0):
+        """ Return (brightness, (R, G, B)) for the time of day """
+        i = self.index(hour, minute, second)
+        
+        return self.brightness[i], tuple(self.colors[i * 3:i * 3 + 3])
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+    
+    print("Curve Test")
+    
+    keyframes = [{ "time": "06:00", "brightness": 100, "kelvin": 2000 },
+                 { "time": "12:00", "brightness": 200, "kelvin": 6500 },
+                 { "time": "19:00", "brightness":  80, "kelvin": 2700 },
+                 { "time": "22:00", "brightness":  50, "kelvin": 1800 }]
+    
+    for interpolation in INTERPOLATIONS:
+        start = time.time()
+        curve = Curve(keyframes, interpolation, step=1)
+        print("{0}: built {1} entries in {2:.3f} s".format(interpolation, curve.size, time.time() - start))
+        
+        for hour in range(0, 24, 3):
+            print("  {0:02d}:00  {1}".format(hour, curve.lookup(hour)))
+    
+    print("Test Complete")
+
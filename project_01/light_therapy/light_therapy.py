@@ -66,6 +66,10 @@ Uses:
   - DS3231 Adafruit library
   - BH1750 Adafruit library
   - Button library developed in EDES 301 class
+    - Button group with timestamped press / hold events
+  - numpy (LED strip pixels)
+  - Time of day schedule (brightness, color, thresholds) in schedule.json
+    - Brightness and color follow a smooth curve between keyframes
 
 """
 
@@ -76,8 +80,11 @@ import busio
 import adafruit_bh1750
 import adafruit_ds3231
 import opc
+import color_lut
+import pixel_strip
 import ht16k33
-import button
+import button_group
+import schedule
 
 # ------------------------------------------------------------------------
 # Constants
@@ -86,6 +93,12 @@ MIN_BRIGHTNESS = 0
 MAX_BRIGHTNESS = 255
 BRIGHTNESS_STEP = 50
 DISPLAY_TIMEOUT = 1  # seconds
+RESET_HOLD_TIME = 3  # seconds a button is held to reset to automatic mode
+UPDATE_PERIOD = 1    # seconds between sensor checks / display updates
+DEBOUNCE_TIME = 0.02 # seconds button changes are ignored after a press / release
+LED_FPS = 30         # maximum LED strip frame rate
+LED_DITHER = False   # dither levels between 8-bit steps (smoother fades, but
+                     # streams frames at LED_FPS while a fractional level is shown)
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -98,39 +111,101 @@ showing_brightness = False
 # Functions / Classes
 # ------------------------------------------------------------------------
 
-# Initialize Components
-i2c = board.I2C()
-led_strip = LEDStrip()
-sensor = adafruit_bh1750.BH1750(i2c)
-rtc = adafruit_ds3231.DS3231(i2c)
-hex_display = ht16k33.HT16K33(1, 0x70)
-
-# Buttons
-increase_btn = button.Button("P2_4", press_low=True)
-decrease_btn = button.Button("P2_2", press_low=True)
-
-# define LED class:
-
 class LEDStrip:
     """ LED strip class """
-    def __init__(self, address='localhost:7890', num_leds=240, color=(255, 255, 255)):
+    def __init__(self, address='localhost:7890', num_leds=240, color=(255, 255, 255), fps=LED_FPS,
+                 lut_config=color_lut.CONFIG_FILE, dither=LED_DITHER):
         self.client = opc.Client(address)
         self.num_leds = num_leds
         self.color = color
         self.brightness = 128
+        self.frame = self.client.frame_buffer(num_leds, channel=0)
+
+        # Gamma and white point tables from the LED server configuration
+        self.lut = color_lut.ColorLUT.from_config(lut_config)
+
+        # Pixel colors (numpy array); segments and scenes can be set on it
+        # directly and are rendered through the lookup tables by show()
+        self.pixels = pixel_strip.PixelStrip(num_leds, lut=self.lut)
+
+        # Last target handed to the ditherer (frames sent without dithering
+        # are deduplicated by the scheduler once they are delivered)
+        self.last_frame = None
+        self.frames_sent = 0
+        self.frames_skipped = 0
 
         if not self.client.can_connect():
             print(f"WARNING: Could not connect to {address}")
 
+        # Cap the output rate; updates within one frame interval are coalesced
+        self.scheduler = opc.FrameScheduler(self.client, fps=fps)
+        self.scheduler.start()
+
+        # Optionally show the levels between the 8-bit steps by dithering
+        self.ditherer = None
+        if dither:
+            self.ditherer = opc.Ditherer(self.client, num_leds, fps=fps)
+            self.ditherer.start()
+
     def set_brightness(self, brightness):
         self.brightness = max(0, min(255, brightness))
-        scaled_color = tuple(int(c * self.brightness / 255) for c in self.color)
-        pixels = [scaled_color] * self.num_leds
-        self.client.put_pixels(pixels, channel=0)
+        self.pixels.brightness = self.brightness
+        self.pixels.fill(self.color)
+        self.show()
 
     def off(self):
-        self.client.put_pixels([(0, 0, 0)] * self.num_leds, channel=0)
-        
+        self.pixels.fill((0, 0, 0))
+        self.show(force=True)
+
+    def show(self, force=False):
+        """ renders the pixels and hands the frame to the scheduler, which
+        skips it if identical to the last one delivered (force=True sends it
+        right away) """
+        if self.ditherer is not None:
+            target = self.pixels.render_exact()
+            if not force and target.tobytes() == self.last_frame:
+                self.frames_skipped += 1
+                return False
+            self.ditherer.set_pixels(target)
+            self.last_frame = target.tobytes()
+            self.frames_sent += 1
+            return True
+
+        self.pixels.render(out=self.frame.array)
+
+        # Always schedule the frame:  it replaces any pending frame, and the
+        # scheduler drops it (frames_skipped) if it matches the frame last
+        # delivered or retries it if sending fails.  frames_sent here counts
+        # frames scheduled, not frames the server received.
+        if not force:
+            self.scheduler.send_frame(self.frame)
+        elif not self.scheduler.send_now(self.frame, reliable=True):
+            return False
+
+        self.frames_sent += 1
+        return True
+
+    def cleanup(self):
+        """ sends any pending frame and stops the frame scheduler """
+        if self.ditherer is not None:
+            self.ditherer.cleanup()
+        self.scheduler.cleanup()
+
+
+# Initialize Components
+i2c = board.I2C()
+led_strip = LEDStrip()
+sensor = adafruit_bh1750.BH1750(i2c)
+rtc = adafruit_ds3231.DS3231(i2c)
+light_schedule = schedule.Schedule()
+hex_display = ht16k33.HT16K33(1, 0x70, auto_flush=False)
+
+# Buttons (watched by one thread; presses and holds arrive as events)
+buttons = button_group.ButtonGroup(edge_detect=True, events=True)
+increase_btn = buttons.add_button("P2_4", active_low=True, hold_time=RESET_HOLD_TIME, debounce_time=DEBOUNCE_TIME)
+decrease_btn = buttons.add_button("P2_2", active_low=True, hold_time=RESET_HOLD_TIME, debounce_time=DEBOUNCE_TIME)
+
+
 def set_rtc_time():
     """ allows for manually setting system time stored in device """
     # Define the date and time (Year, Month, Day, Hour, Minute, Second, Weekday, Julian day, DST)
@@ -146,49 +221,18 @@ def update_leds():
     print(f"Setting LED brightness to: {brightness}")
     led_strip.set_brightness(brightness)
 
-def get_target_brightness_and_color(hour):
-    """ defines brightness and color (R, G, B) for different times of day """
-    if 6 <= hour < 7:      # Sunrise
-        return 100, (255, 100, 0)   # warm orange
-    elif 7 <= hour < 10:   # Morning
-        return 150, (255, 255, 200) # soft white
-    elif 10 <= hour < 16:  # Midday
-        return 200, (255, 255, 255) # bright white
-    elif 16 <= hour < 19:  # Golden hour
-        return 140, (255, 180, 50)  # golden orange
-    elif 19 <= hour < 20:  # Dusk
-        return 80, (150, 100, 100)  # soft pinkish dim
-    else:                  # Night
-        return 50, (50, 50, 100)    # dim cool blue
-
-def get_light_thresholds(hour):
-    """ returns (too_dark_threshold, too_bright_threshold) for different times
-    of the day """
-    if 6 <= hour < 7:       # Sunrise
-        return 30, 150
-    elif 7 <= hour < 10:    # Morning
-        return 80, 250
-    elif 10 <= hour < 16:   # Midday
-        return 100, 350
-    elif 16 <= hour < 19:   # Golden hour
-        return 60, 200
-    elif 19 <= hour < 20:   # Dusk
-        return 30, 120
-    else:                   # Night
-        return 10, 80
-
 def check_auto_brightness():
     """ checks ambient lighting from BH1750 and compares to target brightness 
     and thresholds for each time of day """
     global brightness
-    hour = rtc.datetime.tm_hour
+    dt = rtc.datetime
+    hour = dt.tm_hour
     light_level = sensor.lux
 
-    # Get time-based targets
-    target_brightness, target_color = get_target_brightness_and_color(hour)
-
-    # Time-aware thresholds
-    too_dark_threshold, too_bright_threshold = get_light_thresholds(hour)
+    # Time-based targets (from the precomputed curve) and thresholds
+    target_brightness, target_color = light_schedule.target(hour, dt.tm_min, dt.tm_sec)
+    entry = light_schedule.lookup(hour, dt.tm_min)
+    too_dark_threshold, too_bright_threshold = entry.too_dark, entry.too_bright
 
     # Nudge logic
     brightness_adjustment = 0
@@ -219,6 +263,9 @@ def show_display():
         hex_display.display_number(time_val)
         hex_display.set_colon(True)
 
+    # Send the digits and colon to the display in one I2C transaction
+    hex_display.flush()
+
 def on_increase_press():
     """ increase button press will:
             - increase LED intensity by 50 units
@@ -240,46 +287,52 @@ def on_decrease_press():
     update_leds()
     last_button_press_time = time.time()
     showing_brightness = True
-    
-increase_btn.set_on_press_callback(on_increase_press)
-decrease_btn.set_on_press_callback(on_decrease_press)
+
+def reset_to_auto():
+    """ button held for RESET_HOLD_TIME will:
+            - reset LED intensity to the default
+            - switch HT16K33 back to displaying time"""
+    global brightness, last_button_press_time, showing_brightness
+    print(f"Button held for {RESET_HOLD_TIME} seconds - Resetting to automatic mode")
+    brightness = 100  # Reset to default brightness
+    led_strip.set_brightness(brightness)
+    showing_brightness = False  # Show time on display
+    last_button_press_time = time.time()
+
+def handle_button_event(event):
+    """ dispatches a button event to the matching action """
+    if event.type == button_group.EVENT_PRESS:
+        if event.pin == increase_btn.pin:
+            on_increase_press()
+        elif event.pin == decrease_btn.pin:
+            on_decrease_press()
+    elif event.type == button_group.EVENT_HOLD:
+        reset_to_auto()
 
 
 # ------------------------------------------------------------------------
 # Main script
 # ------------------------------------------------------------------------
+buttons.start()
+next_update_time = time.time()
+
 try:
     while True:
+        # Sleep until a button event arrives or the next update is due
+        event = buttons.get_event(timeout=max(0, next_update_time - time.time()))
+        
+        if event is not None:
+            handle_button_event(event)
+            show_display()
+            
+        if time.time() < next_update_time:
+            continue
+        
+        next_update_time += UPDATE_PERIOD
+
         # Check auto brightness based on light levels
         check_auto_brightness()
 
-        # Monitor button presses for manual adjustment or reset
-        if increase_btn.is_pressed():
-            # Increase button pressed
-            on_increase_press()
-
-        elif decrease_btn.is_pressed():
-            # Decrease button pressed
-            on_decrease_press()
-
-        # Monitor for long button press to reset to automatic mode
-        if increase_btn.is_pressed() or decrease_btn.is_pressed():
-            # Track the time when the button was pressed
-            press_time = time.time()
-            
-            while time.time() - press_time < 3:
-                # Wait for 3 seconds of button hold
-                if not (increase_btn.is_pressed() or decrease_btn.is_pressed()):
-                    break  # Button released early, exit loop
-
-            # Reset to auto if held for 3 seconds
-            if time.time() - press_time >= 3:
-                print("Button held for 3 seconds - Resetting to automatic mode")
-                brightness = 100  # Reset to default brightness
-                led_strip.set_brightness(brightness)
-                showing_brightness = False  # Show time on display
-                last_button_press_time = time.time()
-
         # Manage brightness display timeout (to show time after a timeout)
         if time.time() - last_button_press_time > DISPLAY_TIMEOUT:
             showing_brightness = False
@@ -287,11 +340,18 @@ try:
         # Show the current display
         show_display()
 
-        time.sleep(1)  # Sleep for a second before checking again
-
 except KeyboardInterrupt:
     print("Cleaning up...")
-    increase_btn.cleanup()
-    decrease_btn.cleanup()
+    buttons.cleanup()
     led_strip.off()
+    led_strip.cleanup()
     hex_display.clear()
+    hex_display.flush()
+    hex_display.cleanup()
+    print(f"LED frames scheduled: {led_strip.frames_sent}, skipped: {led_strip.frames_skipped}")
+    if led_strip.ditherer is not None:
+        print(f"LED dithered frames sent: {led_strip.ditherer.frames_sent}, skipped: {led_strip.ditherer.frames_skipped}")
+    print(f"LED scheduler stats: {led_strip.scheduler.get_stats()}")
+    print(f"LED client stats: {led_strip.client.get_stats()}")
+    print(f"Display stats: {hex_display.get_stats()}")
+    print(f"Button bounces rejected: {increase_btn.get_bounces_rejected() + decrease_btn.get_bounces_rejected()}")
@@ -0,0 +1,263 @@
+"""
+--------------------------------------------------------------------------
+Light Therapy Schedule
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Light Therapy Schedule
+
+  The time of day schedule (LED brightness, LED color and the ambient light 
+thresholds) is declared in a JSON file (schedule.json):
+
+  {
+    "periods": [
+      { "name": "Sunrise", "start": "06:00", "brightness": 100, 
+        "color": [255, 100, 0], "thresholds": [30, 150] },
+      ...
+    ]
+  }
+
+  Each period lasts until the start of the next one; the last period of the
+day wraps around to the first.
+
+  The file can also have a "curve" section with keyframes (see curve.py):
+
+    "curve": { "interpolation": "cosine", "step": 60,
+               "keyframes": [ { "time": "06:30", "brightness": 100, 
+                                "color": [255, 100, 0] }, ... ] }
+
+  When it does, target() follows the curve so the brightness and color 
+change smoothly instead of jumping at the start of each period.  The periods are compiled into a table with 
+one entry per minute of the day (1440 entries), so a lookup is a single 
+index.  The file is checked for changes at most every "check_interval" 
+seconds and the table is only rebuilt when the file has changed.
+
+Software API:
+
+  Schedule(path=SCHEDULE_FILE, check_interval=1.0)
+    - Load and compile the schedule file
+
+    lookup(hour, minute=0)
+      - Return the ScheduleEntry for the time of day.  A ScheduleEntry has
+        the fields:
+          name        - Name of the period
+          brightness  - Target LED brightness (0 - 255)
+          color       - Target LED color (R, G, B)
+          too_dark    - Ambient lux below which the LEDs are brightened
+          too_bright  - Ambient lux above which the LEDs are dimmed
+
+    target(hour, minute=0, second=0)
+      - Return (brightness, (R, G, B)) for the time of day, from the curve
+        if there is one, otherwise from the period
+
+    reload(force=False)
+      - Rebuild the table if the file has changed (or if force is True).
+        Returns True if the table was rebuilt.
+
+"""
+import os
+import time
+import json
+import collections
+
+import curve
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+MINUTES_PER_DAY             = 24 * 60
+
+SCHEDULE_FILE               = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                                           "schedule.json")
+
+ScheduleEntry               = collections.namedtuple("ScheduleEntry", 
+                                  ["name", "brightness", "color", "too_dark", "too_bright"])
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def parse_time(value):
+    """ Return the minute of the day for a "HH:MM" string """
+    try:
+        hour, minute = [int(part) for part in value.split(":")]
+    except (AttributeError, ValueError):
+        raise ValueError("Schedule time {0!r} is not HH:MM".format(value))
+    
+    if not ((0 <= hour < 24) and (0 <= minute < 60)):
+        raise ValueError("Schedule time {0!r} is out of range".format(value))
+    
+    return hour * 60 + minute
+
+# End def
+
+
+def compile_schedule(periods):
+    """ Return the list of MINUTES_PER_DAY ScheduleEntry for the periods """
+    if len(periods) == 0:
+        raise ValueError("Schedule has no periods")
+    
+    starts = []
+    
+    for period in periods:
+        too_dark, too_bright = period["thresholds"]
+        entry = ScheduleEntry(period["name"], int(period["brightness"]), 
+                              tuple(int(c) for c in period["color"]), 
+                              too_dark, too_bright)
+        starts.append((parse_time(period["start"]), entry))
+    
+    starts.sort(key=lambda start: start[0])
+    
+    # Minutes before the first start belong to the last period of the day
+    table = [starts[-1][1]] * MINUTES_PER_DAY
+    
+    for i, (start, entry) in enumerate(starts):
+        end = starts[i + 1][0] if (i + 1 < len(starts)) else MINUTES_PER_DAY
+        table[start:end] = [entry] * (end - start)
+    
+    return table
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class Schedule():
+    """ Time of day schedule compiled to a per-minute table """
+    path                = None
+    check_interval      = None
+    next_check_time     = None
+    file_stamp          = None   # (mtime, size) of the file the table came from
+    table               = None
+    curve               = None   # None if the file has no curve
+    
+    def __init__(self, path=SCHEDULE_FILE, check_interval=1.0):
+        """ Load and compile the schedule file """
+        self.path           = path
+        self.check_interval = check_interval
+        
+        self.reload(force=True)
+    
+    # End def
+    
+    
+    def reload(self, force=False):
+        """ Rebuild the table if the file changed.  Returns True if rebuilt. """
+        stat       = os.stat(self.path)
+        file_stamp = (stat.st_mtime_ns, stat.st_size)
+        
+        self.next_check_time = time.time() + self.check_interval
+        
+        if not force and (file_stamp == self.file_stamp):
+            return False
+        
+        # Remember the file even if it is bad so it is not reported again
+        self.file_stamp = file_stamp
+        
+        with open(self.path) as f:
+            data = json.load(f)
+        
+        table = compile_schedule(data["periods"])
+        
+        if "curve" in data:
+            light_curve = curve.Curve(data["curve"]["keyframes"], 
+                                      data["curve"].get("interpolation", "cosine"),
+                                      data["curve"].get("step", 60))
+        else:
+            light_curve = None
+        
+        # Only replace the table and curve once both compiled
+        self.table = table
+        self.curve = light_curve
+        
+        return True
+    
+    # End def
+    
+    
+    def lookup(self, hour, minute=0):
+        """ Return the ScheduleEntry for the time of day """
+        if time.time() >= self.next_check_time:
+            try:
+                self.reload()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Keep running on the last good table
+                print("WARNING: Could not reload schedule: {0}".format(e))
+        
+        return self.table[(hour * 60 + minute) % MINUTES_PER_DAY]
+    
+    # End def
+    
+    
+    def target(self, hour, minute=0, second=0):
+        """ Return (brightness, (R, G, B)) for the time of day """
+        entry = self.lookup(hour, minute)
+        
+        if self.curve is None:
+            return entry.brightness, entry.color
+        
+        return self.curve.lookup(hour, minute, second)
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    print("Schedule Test")
+    
+    schedule = Schedule()
+    
+    for hour in range(24):
+        print("{0:02d}:00  {1}  {2}".format(hour, schedule.lookup(hour).name, 
+                                          schedule.target(hour)))
+    
+    # Time lookups
+    count = 100000
+    start = time.time()
+    for i in range(count):
+        schedule.lookup(12, 30)
+    print("lookup(): {0:.2f} us".format((time.time() - start) / count * 1e6))
+    
+    print("Test Complete")
+
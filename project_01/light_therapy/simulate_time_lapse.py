@@ -8,29 +8,96 @@ import adafruit_bh1750
 import adafruit_ds3231
 import ht16k33
 import opc
+import color_lut
+import pixel_strip
+import schedule
+
+LED_FPS = 30  # maximum LED strip frame rate
+LED_DITHER = False  # dither levels between 8-bit steps (smoother fades, but
+                    # streams frames at LED_FPS while a fractional level is shown)
 
 # -----------------------------------------------------------
 # Define LEDStrip Class (copy from your main program)
 # -----------------------------------------------------------
 class LEDStrip:
     """ LED strip class """
-    def __init__(self, address='localhost:7890', num_leds=240, color=(255, 255, 255)):
+    def __init__(self, address='localhost:7890', num_leds=240, color=(255, 255, 255), fps=LED_FPS,
+                 lut_config=color_lut.CONFIG_FILE, dither=LED_DITHER):
         self.client = opc.Client(address)
         self.num_leds = num_leds
         self.color = color
         self.brightness = 128
+        self.frame = self.client.frame_buffer(num_leds, channel=0)
+
+        # Gamma and white point tables from the LED server configuration
+        self.lut = color_lut.ColorLUT.from_config(lut_config)
+
+        # Pixel colors (numpy array); segments and scenes can be set on it
+        # directly and are rendered through the lookup tables by show()
+        self.pixels = pixel_strip.PixelStrip(num_leds, lut=self.lut)
+
+        # Last target handed to the ditherer (frames sent without dithering
+        # are deduplicated by the scheduler once they are delivered)
+        self.last_frame = None
+        self.frames_sent = 0
+        self.frames_skipped = 0
 
         if not self.client.can_connect():
             print(f"WARNING: Could not connect to {address}")
 
+        # Cap the output rate; updates within one frame interval are coalesced
+        self.scheduler = opc.FrameScheduler(self.client, fps=fps)
+        self.scheduler.start()
+
+        # Optionally show the levels between the 8-bit steps by dithering
+        self.ditherer = None
+        if dither:
+            self.ditherer = opc.Ditherer(self.client, num_leds, fps=fps)
+            self.ditherer.start()
+
     def set_brightness(self, brightness):
         self.brightness = max(0, min(255, brightness))
-        scaled_color = tuple(int(c * self.brightness / 255) for c in self.color)
-        pixels = [scaled_color] * self.num_leds
-        self.client.put_pixels(pixels, channel=0)
+        self.pixels.brightness = self.brightness
+        self.pixels.fill(self.color)
+        self.show()
 
     def off(self):
-        self.client.put_pixels([(0, 0, 0)] * self.num_leds, channel=0)
+        self.pixels.fill((0, 0, 0))
+        self.show(force=True)
+
+    def show(self, force=False):
+        """ renders the pixels and hands the frame to the scheduler, which
+        skips it if identical to the last one delivered (force=True sends it
+        right away) """
+        if self.ditherer is not None:
+            target = self.pixels.render_exact()
+            if not force and target.tobytes() == self.last_frame:
+                self.frames_skipped += 1
+                return False
+            self.ditherer.set_pixels(target)
+            self.last_frame = target.tobytes()
+            self.frames_sent += 1
+            return True
+
+        self.pixels.render(out=self.frame.array)
+
+        # Always schedule the frame:  it replaces any pending frame, and the
+        # scheduler drops it (frames_skipped) if it matches the frame last
+        # delivered or retries it if sending fails.  frames_sent here counts
+        # frames scheduled, not frames the server received.
+        if not force:
+            self.scheduler.send_frame(self.frame)
+        elif not self.scheduler.send_now(self.frame, reliable=True):
+            return False
+
+        self.frames_sent += 1
+        return True
+
+    def cleanup(self):
+        """ sends any pending frame and stops the frame scheduler """
+        if self.ditherer is not None:
+            self.ditherer.cleanup()
+        self.scheduler.cleanup()
 
 # -----------------------------------------------------------
 # Initialize Hardware
@@ -45,26 +112,14 @@ led_strip = LEDStrip()
 rtc = adafruit_ds3231.DS3231(i2c)
 
 # Hex Display
-hex_display = ht16k33.HT16K33(1, 0x70)
+hex_display = ht16k33.HT16K33(1, 0x70, auto_flush=False)
+
+# Time of day schedule (schedule.json)
+light_schedule = schedule.Schedule()
 
 # -----------------------------------------------------------
 # Supporting Functions
 # -----------------------------------------------------------
-def get_target_brightness_and_color(hour):
-    """ defines brightness and color (R, G, B) for different times of day """
-    if 6 <= hour < 7:      # Sunrise
-        return 100, (255, 100, 0)   # warm orange
-    elif 7 <= hour < 10:   # Morning
-        return 150, (255, 255, 200) # soft white
-    elif 10 <= hour < 16:  # Midday
-        return 200, (255, 255, 255) # bright white
-    elif 16 <= hour < 19:  # Golden hour
-        return 140, (255, 180, 50)  # golden orange
-    elif 19 <= hour < 20:  # Dusk
-        return 80, (150, 100, 100)  # soft pinkish dim
-    else:                  # Night
-        return 50, (50, 50, 100)    # dim cool blue
-
 def show_display():
     """ Show time on hex display """
     dt = rtc.datetime
@@ -72,25 +127,16 @@ def show_display():
     time_val = hour * 100 + minute
     hex_display.display_number(time_val)
     hex_display.set_colon(True)
+    hex_display.flush()
 
 
-# Assume all imports, LEDStrip class, rtc, hex_display, and get_target_brightness_and_color() are already set up.
+# Assume all imports, LEDStrip class, rtc, hex_display, and light_schedule are already set up.
 
 simulated_hours = [5, 6, 7, 9, 12, 16, 18, 19, 21, 23]  # Key times of day
 transition_duration = 4  # seconds per transition
 transition_steps = 40    # steps during transition
 pause_between_hours = 2  # seconds pause between hours
 
-def lerp(start, end, t):
-    return start + (end - start) * t
-
-def lerp_color(start_color, end_color, t):
-    return (
-        int(lerp(start_color[0], end_color[0], t)),
-        int(lerp(start_color[1], end_color[1], t)),
-        int(lerp(start_color[2], end_color[2], t)),
-    )
-
 def smooth_set_led(brightness_value, color_value):
     led_strip.color = color_value
     led_strip.set_brightness(brightness_value)
@@ -107,25 +153,20 @@ def simulate_smooth_time_travel_with_clock():
             start_hour = simulated_hours[i]
             end_hour = simulated_hours[i + 1]
 
-            # Set initial and target LED settings
-            start_brightness, start_color = get_target_brightness_and_color(start_hour)
-            end_brightness, end_color = get_target_brightness_and_color(end_hour)
-
             print(f"Transitioning from {start_hour:02d}:00 to {end_hour:02d}:00")
 
             # Smoothly transition
             for step in range(transition_steps + 1):
                 t = step / transition_steps
 
-                # Interpolate brightness and color
-                current_brightness = int(lerp(start_brightness, end_brightness, t))
-                current_color = lerp_color(start_color, end_color, t)
-
                 # Calculate "fake" clock time
                 total_minutes = (start_hour * 60) + (end_hour - start_hour) * 60 * t
                 fake_hour = int(total_minutes // 60) % 24
                 fake_minute = int(total_minutes % 60)
 
+                # Brightness and color from the precomputed curve
+                current_brightness, current_color = light_schedule.target(fake_hour, fake_minute)
+
                 # Update RTC and hex display
                 update_fake_rtc(fake_hour, fake_minute)
                 show_display()
@@ -138,12 +179,17 @@ def simulate_smooth_time_travel_with_clock():
             # Pause briefly at the end of transition
             time.sleep(pause_between_hours)
 
+        # Make sure the final frame reaches the strip
+        led_strip.cleanup()
+
         print("\nSmooth Time-Lapse Simulation Complete.")
 
     except KeyboardInterrupt:
         print("Simulation interrupted. Cleaning up...")
         led_strip.off()
+        led_strip.cleanup()
         hex_display.clear()
+        hex_display.flush()
 
 if __name__ == "__main__":
     try:
@@ -151,4 +197,6 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("Simulation interrupted. Cleaning up...")
         led_strip.off()
+        led_strip.cleanup()
         hex_display.clear()
+        hex_display.flush()
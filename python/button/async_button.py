@@ -0,0 +1,373 @@
+"""
+--------------------------------------------------------------------------
+Asyncio Button Driver
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Asyncio Button Driver
+
+  This driver provides a button for asyncio applications.  Instead of a 
+thread or sleep based polling, the GPIO value file is watched by the event 
+loop (loop.add_reader on an epoll handle waiting for the kernel's edge 
+notification), so buttons, sensor polling and LED output can all share one
+event loop.
+
+  To select the pull up configuration, active_low=True.  To select the pull 
+down configuration, active_low=False.
+
+Software API:
+
+  AsyncButton(pin, active_low=True, debounce_time=None, debounce_samples=None)
+    - Provide pin that the button monitors
+    - Optional debounce filter (see debounce.py)
+    
+    start()
+      - Start watching the pin on the running event loop
+    
+    is_pressed()
+      - Return a boolean value (i.e. True/False) on if button is pressed
+    
+    await wait_for_press()
+      - Wait for the next press; return its ButtonEvent
+    
+    await wait_for_release()
+      - Wait for the next release; return its ButtonEvent (the duration is 
+        the length of the press)
+    
+    async for event in events():
+      - Iterate over ButtonEvents (EVENT_PRESS / EVENT_RELEASE, see 
+        button_group.py) as they happen
+    
+    get_last_press_duration()
+      - Return the duration the button was last pressed
+
+    get_bounces_rejected()
+      - Return the number of bounces rejected by the debounce filter
+    
+    cleanup()
+      - Stop watching the pin
+
+"""
+import os
+import time
+import select
+import asyncio
+
+import Adafruit_BBIO.GPIO as GPIO
+
+import gpio_pins
+from debounce import Debouncer
+from button_group import ButtonEvent, EVENT_PRESS, EVENT_RELEASE
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH          = GPIO.HIGH
+LOW           = GPIO.LOW
+
+SYSFS_GPIO    = "/sys/class/gpio/gpio{0}"
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class AsyncButton():
+    """ Asyncio Button Class """
+    pin                           = None
+    
+    unpressed_value               = None
+    pressed_value                 = None
+    
+    pressed                       = None # last (debounced) state
+    press_time                    = None
+    press_duration                = None
+    debouncer                     = None # None if not debounced
+    
+    value_fd                      = None # GPIO value file
+    epoll                         = None # epoll handle watched by the loop
+    loop                          = None
+    listeners                     = None # one asyncio.Queue per consumer
+    
+    def __init__(self, pin=None, active_low=True, debounce_time=None, debounce_samples=None):
+        """ Initialize variables and set up the button """
+        if (pin == None):
+            raise ValueError("Pin not provided for AsyncButton()")
+        else:
+            self.pin = pin
+        
+        if active_low:
+            self.unpressed_value = HIGH
+            self.pressed_value   = LOW
+        else:
+            self.unpressed_value = LOW
+            self.pressed_value   = HIGH
+        
+        if debounce_samples is not None:
+            self.debouncer = Debouncer(samples=debounce_samples)
+        elif debounce_time is not None:
+            self.debouncer = Debouncer(window=debounce_time)
+        
+        self.press_duration  = 0.0
+        self.listeners       = set()
+        
+        # Initialize the hardware components        
+        self._setup()
+    
+    # End def
+    
+    
+    def _setup(self):
+        """ Setup the hardware components. """
+        # Export and configure the pin
+        GPIO.setup(self.pin, GPIO.IN)
+        
+        gpio_dir = SYSFS_GPIO.format(gpio_pins.gpio_number(self.pin))
+        
+        # Ask the kernel to notify both edges
+        with open(os.path.join(gpio_dir, "edge"), "w") as edge_file:
+            edge_file.write("both")
+        
+        self.value_fd = os.open(os.path.join(gpio_dir, "value"), os.O_RDONLY | os.O_NONBLOCK)
+        
+        # sysfs signals an edge with EPOLLPRI, which loop.add_reader cannot 
+        # wait for directly.  Wrap it in an epoll handle, which becomes 
+        # readable when the edge arrives.
+        self.epoll = select.epoll()
+        self.epoll.register(self.value_fd, select.EPOLLPRI | select.EPOLLERR)
+        
+        self.pressed = (self._read_value() == self.pressed_value)
+        
+    # End def
+    
+    
+    def _read_value(self):
+        """ Read the current value of the GPIO value file """
+        os.lseek(self.value_fd, 0, os.SEEK_SET)
+        
+        if os.read(self.value_fd, 1) == b"1":
+            return HIGH
+        
+        return LOW
+    
+    # End def
+    
+    
+    def start(self):
+        """ Start watching the pin on the running event loop """
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.epoll.fileno(), self._on_edge)
+    
+    # End def
+    
+    
+    def _on_edge(self):
+        """ Called by the event loop when the kernel reports an edge """
+        if self.value_fd is None:
+            # Button was cleaned up
+            return
+        
+        now = time.time()
+        
+        # Clear the notification
+        self.epoll.poll(0)
+        
+        pressed = (self._read_value() == self.pressed_value)
+        
+        if self.debouncer is not None:
+            self.debouncer.edge(pressed, now)
+            pressed = self.debouncer.state
+            
+            # Confirm a change that is still waiting once the window is over
+            if not self.debouncer.is_settled():
+                self.loop.call_later(self.debouncer.window, self._on_edge)
+        
+        if pressed and not self.pressed:
+            self.pressed    = True
+            self.press_time = now
+            self._emit(ButtonEvent(EVENT_PRESS, self.pin, now, 0.0))
+        
+        elif not pressed and self.pressed:
+            self.pressed        = False
+            self.press_duration = now - self.press_time
+            self._emit(ButtonEvent(EVENT_RELEASE, self.pin, now, self.press_duration))
+    
+    # End def
+    
+    
+    def _emit(self, event):
+        """ Give the event to every consumer """
+        for listener in self.listeners:
+            listener.put_nowait(event)
+    
+    # End def
+    
+    
+    def is_pressed(self):
+        """ Is the Button pressed?
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        return self.pressed
+    
+    # End def
+    
+    
+    async def events(self):
+        """ Asynchronous iterator over the button events """
+        listener = asyncio.Queue()
+        self.listeners.add(listener)
+        
+        try:
+            while True:
+                yield await listener.get()
+        finally:
+            self.listeners.discard(listener)
+    
+    # End def
+    
+    
+    async def _wait_for(self, event_type):
+        """ Wait for the next event of the given type """
+        # Register the queue directly (not through events()) so it is 
+        # removed as soon as the event arrives or the wait is cancelled
+        listener = asyncio.Queue()
+        self.listeners.add(listener)
+        
+        try:
+            while True:
+                event = await listener.get()
+                
+                if event.type == event_type:
+                    return event
+        finally:
+            self.listeners.discard(listener)
+    
+    # End def
+    
+    
+    async def wait_for_press(self):
+        """ Wait for the button to be pressed; return the press event """
+        return await self._wait_for(EVENT_PRESS)
+    
+    # End def
+    
+    
+    async def wait_for_release(self):
+        """ Wait for the button to be released; return the release event """
+        return await self._wait_for(EVENT_RELEASE)
+    
+    # End def
+
+    
+    def get_last_press_duration(self):
+        """ Return the last press duration """
+        return self.press_duration
+    
+    # End def
+
+
+    def get_bounces_rejected(self):
+        """ Return the number of bounces rejected by the debounce filter """
+        if self.debouncer is None:
+            return 0
+        
+        return self.debouncer.get_bounces_rejected()
+
+    # End def
+    
+    
+    def cleanup(self):
+        """ Stop watching the pin """
+        if self.loop is not None:
+            self.loop.remove_reader(self.epoll.fileno())
+            self.loop = None
+        
+        if self.epoll is not None:
+            self.epoll.close()
+            self.epoll = None
+        
+        if self.value_fd is not None:
+            os.close(self.value_fd)
+            self.value_fd = None
+    
+    # End def
+
+# End class
+
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    """ This test prints the events of one button while a second task keeps
+    running in the same event loop.
+    """
+    print("Asyncio Button Test")
+
+    async def ticker():
+        while True:
+            print("  tick")
+            await asyncio.sleep(1)
+    
+    async def main():
+        button = AsyncButton("P2_2", debounce_time=0.02)
+        button.start()
+        
+        tick_task = asyncio.ensure_future(ticker())
+        
+        try:
+            print("Waiting for button press ...")
+            await button.wait_for_press()
+            print("    Button pressed")
+            
+            async for event in button.events():
+                print("    {0} at {1:.3f}".format(event.type, event.timestamp))
+        finally:
+            tick_task.cancel()
+            button.cleanup()
+    
+    # Use a Keyboard Interrupt (i.e. "Ctrl-C") to exit the test
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+    print("Test Complete")
+
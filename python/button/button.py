@@ -47,21 +47,42 @@ configuration, press_low=False.
 
 Software API:
 
-  Button(pin, press_low, sleep_time)
+  Button(pin, press_low, sleep_time, edge_detect=False, debounce_time=None,
+         debounce_samples=None, gpio_map=None)
     - Provide pin that the button monitors
     - Sleep time prevents CPU from being overloaded
+    - If edge_detect is True, the button waits for GPIO edges reported by the
+      kernel instead of polling the pin every "sleep_time".  Waiting then 
+      takes no CPU, presses shorter than "sleep_time" are not missed, and 
+      press / release times come from the edge.  Only edges that leave the
+      pin at the pressed level count as presses, and edges within 
+      EDGE_BOUNCE_TIME of a release are ignored as release bounce.  
+      Callbacks that run while waiting (pressed / unpressed) are still 
+      executed every "sleep_time".
+    - Debouncing (see debounce.py) is off by default.  debounce_time 
+      ignores changes within that many seconds of the last accepted change;
+      debounce_samples requires that many more pressed than unpressed 
+      samples (integrator) before a change is accepted.
+    - gpio_map (optional) is a GPIOMap (see gpio_mmap.py).  The pin is then
+      read straight from the memory-mapped DATAIN register instead of 
+      through Adafruit_BBIO.GPIO.input().
     
     wait_for_press()
       - Wait for the button to be pressed 
       - Function consumes time - matters for embedded hardware
         
-    is_pressed()
+    is_pressed(snapshot=None)
       - Return a boolean value (i.e. True/False) on if button is pressed
       - Function consumes no time
+      - If a PinSnapshot (see pin_snapshot.py) is given, the pin value from
+        its last read() is used instead of reading the pin
     
     get_last_press_duration()
       - Return the duration the button was last pressed
 
+    get_bounces_rejected()
+      - Return the number of bounces rejected by the debounce filter
+
     cleanup()
       - Clean up HW (very important for motors, anything with sound)
       
@@ -90,9 +111,12 @@ Software API:
 
 """
 import time
+import threading
 
 import Adafruit_BBIO.GPIO as GPIO
 
+from debounce import Debouncer
+
 # ------------------------------------------------------------------------
 # Constants
 # ------------------------------------------------------------------------
@@ -100,6 +124,9 @@ import Adafruit_BBIO.GPIO as GPIO
 HIGH          = GPIO.HIGH # redefine so that we can change high/low here if needed
 LOW           = GPIO.LOW
 
+EDGE_BOUNCE_TIME = 0.01     # seconds after a release in which edges to the 
+                            # pressed level are bounce (edge_detect, no debouncer)
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -119,6 +146,14 @@ class Button():
     
     sleep_time                    = None
     press_duration                = None
+    
+    edge_detect                   = None
+    edge_event                    = None # set by the GPIO edge thread
+    edge_time                     = None # time of the last edge
+    press_edge_time               = None # time of the last edge to the pressed level
+    release_time                  = None # time of the last release
+    debouncer                     = None # None if not debounced
+    gpio_map                      = None # None to use Adafruit_BBIO.GPIO
     # four callback functions, four callback values
     pressed_callback              = None
     pressed_callback_value        = None
@@ -130,7 +165,8 @@ class Button():
     on_release_callback_value     = None
     
     
-    def __init__(self, pin=None, press_low=True, sleep_time=0.1):
+    def __init__(self, pin=None, press_low=True, sleep_time=0.1, edge_detect=False, 
+                 debounce_time=None, debounce_samples=None, gpio_map=None):
         """ Initialize variables and set up the button """
         if (pin == None): # None is a value that means nothing is assigned
             raise ValueError("Pin not provided for Button()")
@@ -149,6 +185,16 @@ class Button():
         # By default sleep time is "0.1" seconds
         self.sleep_time      = sleep_time
         self.press_duration  = 0.0        
+        
+        self.edge_detect     = edge_detect
+        self.edge_event      = threading.Event()
+        
+        if debounce_samples is not None:
+            self.debouncer   = Debouncer(samples=debounce_samples)
+        elif debounce_time is not None:
+            self.debouncer   = Debouncer(window=debounce_time)
+        
+        self.gpio_map        = gpio_map
 
         # Initialize the hardware components        
         self._setup()
@@ -162,11 +208,129 @@ class Button():
         # HW#4 TODO: (one line of code)
         #   Remove "pass" and use the Adafruit_BBIO.GPIO library to set up the button
         GPIO.setup(self.pin, GPIO.IN)
+        
+        # Have the kernel report both edges (epoll on the GPIO value file)
+        if self.edge_detect:
+            GPIO.add_event_detect(self.pin, GPIO.BOTH, callback=self._on_edge)
+
+    # End def
+
+
+    def _on_edge(self, channel):
+        """ Called by the GPIO library on every edge of the pin """
+        now = time.time()
+        
+        # Only an edge that leaves the pin at the pressed level can be a press
+        if self._read() == self.pressed_value:
+            self.press_edge_time = now
+        
+        self.edge_time = now
+        self.edge_event.set()
+
+    # End def
+
+
+    def _wait_for_change(self, callback):
+        """ Wait until the button may have changed state.
+        
+           Polling:      Sleep for "sleep_time"
+           Edge detect:  Block until an edge arrives.  If there is a callback
+                         to execute while waiting, wake up every "sleep_time"
+        
+           Returns:  Time of the edge, or None if no edge was seen
+        """
+        if not self.edge_detect:
+            time.sleep(self.sleep_time) # delay to prevent overconsumption of CPU
+            return None
+        
+        # Wake up to run the callback, or to confirm a debounced change
+        if (callback is not None) or ((self.debouncer is not None) and not self.debouncer.is_settled()):
+            timeout = self.sleep_time
+        else:
+            timeout = None
+        
+        if self.edge_event.wait(timeout):
+            self.edge_event.clear()
+            return self.edge_time
+        
+        return None
 
     # End def
 
 
-    def is_pressed(self):
+    def _read(self, snapshot=None):
+        """ Return the pin value (or take it from the snapshot) """
+        if snapshot is not None:
+            return snapshot.input(self.pin)
+        
+        if self.gpio_map is not None:
+            return self.gpio_map.input(self.pin)
+        
+        return GPIO.input(self.pin)
+
+    # End def
+
+
+    def _sample(self, snapshot=None):
+        """ Read the pin (or take it from the snapshot) and pass it through 
+        the debounce filter (if any)
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        pressed = (self._read(snapshot) == self.pressed_value)
+        
+        if self.debouncer is None:
+            return pressed
+        
+        return self.debouncer.update(pressed, time.time())
+
+    # End def
+
+
+    def _settle_release(self):
+        """ Edge detect without a debouncer:  wait until EDGE_BOUNCE_TIME 
+        after the last release, so the release bounce is not seen as a press """
+        if (not self.edge_detect) or (self.debouncer is not None) or (self.release_time is None):
+            return
+        
+        remaining = self.release_time + EDGE_BOUNCE_TIME - time.time()
+        
+        if remaining > 0:
+            time.sleep(remaining)
+
+    # End def
+
+
+    def _edge_press_time(self, edge_time):
+        """ Return the press time if an edge seen while the button is 
+        unpressed is a press, otherwise None.  The pin must have been at the 
+        pressed level at an edge (a release edge is not a press), and edges 
+        within the debounce window are rejected as bounces. """
+        press_time = self.press_edge_time
+        
+        if (edge_time is None) or (press_time is None):
+            return None
+        
+        if (self.debouncer is not None) and not self.debouncer.edge(True, press_time):
+            return None
+        
+        return press_time
+
+    # End def
+
+
+    def get_bounces_rejected(self):
+        """ Return the number of bounces rejected by the debounce filter """
+        if self.debouncer is None:
+            return 0
+        
+        return self.debouncer.get_bounces_rejected()
+
+    # End def
+
+
+    def is_pressed(self, snapshot=None):
         """ Is the Button pressed?
         
            Returns:  True  - Button is pressed
@@ -175,7 +339,7 @@ class Button():
         # HW#4 TODO: (one line of code)
         #   Remove "pass" and return the comparison of input value of the GPIO pin of 
         #   the buton (i.e. self.pin) to the "pressed value" of the class 
-        return GPIO.input(self.pin) == self.pressed_value # reference instance of this button
+        return self._sample(snapshot) # reference instance of this button
 
     # End def
 
@@ -194,6 +358,11 @@ class Button():
         """
         button_press_time = None
         
+        # Ignore edges from before this call (and the last release bounce)
+        self._settle_release()
+        self.edge_event.clear()
+        self.press_edge_time = None
+        
         # Wait for button press
         #   Execute the unpressed callback function based on the sleep time
         #
@@ -203,15 +372,23 @@ class Button():
         #   of the class (i.e. we are executing the while loop while the 
         #   button is not being pressed)
         #
-        while GPIO.input(self.pin) == self.unpressed_value: # only execute when not pressed
+        while not self._sample(): # only execute when not pressed
         
             if self.unpressed_callback is not None: # if we have something to do in the callback function
                 self.unpressed_callback_value = self.unpressed_callback()
             
-            time.sleep(self.sleep_time) # delay to prevent overconsumption of CPU
+            # From the unpressed state, an edge to the pressed level is a
+            # press (even if the button was already released again)
+            edge_time = self._wait_for_change(self.unpressed_callback)
+            
+            button_press_time = self._edge_press_time(edge_time)
+            
+            if button_press_time is not None:
+                break
             
         # Record time
-        button_press_time = time.time() # record time when button is pressed
+        if button_press_time is None:
+            button_press_time = time.time() # record time when button is pressed
         
         # Executed the on press callback function
         if self.on_press_callback is not None: # if we have something to do in the callback function
@@ -226,15 +403,21 @@ class Button():
         #   of the class (i.e. we are executing the while loop while the 
         #   button is being pressed)
         #
-        while GPIO.input(self.pin) == self.pressed_value: # what to do when button is pressed
+        button_release_time = None
+        
+        while self._sample(): # what to do when button is pressed
         
             if self.pressed_callback is not None:
                 self.pressed_callback_value = self.pressed_callback()
                 
-            time.sleep(self.sleep_time)
+            button_release_time = self._wait_for_change(self.pressed_callback)
         
         # Record the press duration
-        self.press_duration = time.time() - button_press_time
+        if (button_release_time is None) or (button_release_time < button_press_time):
+            button_release_time = time.time()
+        
+        self.press_duration = button_release_time - button_press_time
+        self.release_time   = button_release_time
 
         # Execute the on release callback function
         if self.on_release_callback is not None: 
@@ -252,8 +435,9 @@ class Button():
     
     def cleanup(self):
         """ Clean up the button hardware. """
-        # Nothing to do for GPIO
-        pass
+        # Stop edge detection; nothing else to do for GPIO
+        if self.edge_detect:
+            GPIO.remove_event_detect(self.pin)
     
     # End def
     
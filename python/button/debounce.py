@@ -0,0 +1,205 @@
+"""
+--------------------------------------------------------------------------
+Button Debounce Filter
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Button Debounce Filter
+
+  Mechanical button contacts "bounce" for a few milliseconds when they are 
+pressed or released, so a single press can look like several.  This filter
+sits between the raw pin samples and the button callbacks and only passes 
+on real changes.  Two filters are supported:
+
+  - Time window (window=seconds):  The first change is accepted right away,
+    then any further change within "window" seconds of it is rejected.
+  - Integrator (samples=N):  A counter moves up by one for every pressed 
+    sample and down by one for every unpressed sample (between 0 and N).  
+    The state only changes when the counter reaches N (pressed) or 0 
+    (unpressed).
+
+Software API:
+
+  Debouncer(window=0.02, samples=None, state=False)
+    - If samples is given, the integrator is used; otherwise the time window
+    - state is the initial (pressed) state
+    
+    update(raw, now)
+      - Process a raw sample (True = pressed) taken at time "now" and return
+        the debounced state
+    
+    edge(pressed, now)
+      - Process a change to "pressed" reported by edge detection at time 
+        "now".  Return True if the change is accepted.
+    
+    is_settled()
+      - Return True if the last raw sample agrees with the debounced state 
+        (i.e. no change is waiting to be confirmed)
+
+    get_bounces_rejected()
+      - Return the number of raw changes rejected as bounces
+
+"""
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Debouncer():
+    """ Debounce Filter Class """
+    window                        = None
+    samples                       = None
+    
+    state                         = None # debounced state
+    last_raw                      = None
+    last_change_time              = None
+    count                         = None # integrator counter
+    bounces_rejected              = None
+    
+    def __init__(self, window=0.02, samples=None, state=False):
+        """ Initialize variables """
+        self.window           = window
+        self.samples          = samples
+        
+        self.state            = state
+        self.last_raw         = state
+        self.last_change_time = None
+        self.bounces_rejected = 0
+        
+        if state:
+            self.count = samples
+        else:
+            self.count = 0
+    
+    # End def
+
+
+    def update(self, raw, now):
+        """ Process a raw sample and return the debounced state """
+        if self.samples is not None:
+            self._integrate(raw)
+        elif raw != self.state:
+            self._change(raw, now)
+        
+        self.last_raw = raw
+        
+        return self.state
+
+    # End def
+
+
+    def edge(self, pressed, now):
+        """ Process a change reported by edge detection.  Return True if the
+        change is accepted. """
+        if self.samples is not None:
+            # The integrator needs samples; the edge only triggers sampling
+            return self.update(pressed, now) == pressed
+        
+        if pressed == self.state:
+            return True
+        
+        accepted = self._change(pressed, now)
+        self.last_raw = pressed
+        
+        return accepted
+
+    # End def
+
+
+    def _change(self, raw, now):
+        """ Time window: accept the change unless it is within the window of
+        the last accepted change """
+        if (self.last_change_time is not None) and (now - self.last_change_time < self.window):
+            # Only count the first rejected sample of each bounce
+            if raw != self.last_raw:
+                self.bounces_rejected += 1
+            return False
+        
+        self.state            = raw
+        self.last_change_time = now
+        
+        return True
+
+    # End def
+
+
+    def _integrate(self, raw):
+        """ Integrator: move the counter and change state at either end """
+        if raw:
+            self.count = min(self.samples, self.count + 1)
+        else:
+            self.count = max(0, self.count - 1)
+        
+        if self.count == self.samples:
+            state = True
+        elif self.count == 0:
+            state = False
+        else:
+            state = self.state
+        
+        if (state == self.state) and (raw == self.state) and (self.last_raw != self.state):
+            # The sample went back before the change was confirmed
+            self.bounces_rejected += 1
+        
+        self.state = state
+
+    # End def
+
+
+    def is_settled(self):
+        """ Does the last raw sample agree with the debounced state? """
+        if self.samples is not None:
+            return self.count in (0, self.samples)
+        
+        return self.last_raw == self.state
+
+    # End def
+
+
+    def get_bounces_rejected(self):
+        """ Return the number of raw changes rejected as bounces """
+        return self.bounces_rejected
+
+    # End def
+
+# End class
+
@@ -0,0 +1,320 @@
+"""
+--------------------------------------------------------------------------
+Memory-Mapped GPIO Registers
+--------------------------------------------------------------------------
+License:   
+Copyright 2025 - Sophianne Loh
+
+Redistribution and use in source and binary forms, with or without 
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this 
+list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, 
+this list of conditions and the following disclaimer in the documentation 
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors 
+may be used to endorse or promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" 
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE 
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE 
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL 
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER 
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, 
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Memory-Mapped GPIO Registers
+
+  Reads and writes the AM335x GPIO bank registers directly, the same way 
+mmap/devmem2.c does:  each 4 KB bank is mapped from /dev/mem once, and then
+every pin read or write is a single 32-bit register access instead of a 
+call through Adafruit_BBIO.GPIO.  A whole bank (32 pins) is read with one 
+load of DATAIN.  Writes go through SETDATAOUT / CLEARDATAOUT so only the 
+bits in the mask change and no read-modify-write is needed.
+
+  The pins must still be configured (pin mux via config-pin and direction 
+via GPIO.setup() or setup() below) before they are used.  /dev/mem needs 
+root.
+
+  For testing without hardware, the map can be backed by a regular file 
+(see create_fake_register_map()).  The file holds the four banks back to 
+back at GPIO_BANK_SIZE offsets, and writes to SETDATAOUT / CLEARDATAOUT 
+are applied to DATAOUT and DATAIN the way the hardware would.
+
+Software API:
+
+  GPIOMap(path=DEV_MEM)
+    - Map the four GPIO banks from "path".  Any path other than DEV_MEM is 
+      treated as a fake register map file.
+
+    read_bank(bank)
+      - Return the 32-bit DATAIN value of the bank
+
+    set_bits(bank, mask) / clear_bits(bank, mask)
+      - Drive the pins in the mask high / low
+
+    input(pin)
+      - Return the value (0 / 1) of the pin (e.g. "P2_2")
+
+    output(pin, value)
+      - Drive the pin high (value true) or low (value false)
+
+    setup(pin, direction)
+      - Set the pin direction (DIRECTION_IN / DIRECTION_OUT) in the OE register
+
+    read_register(bank, offset) / write_register(bank, offset, value)
+      - Raw 32-bit register access
+
+    close()
+      - Unmap the banks
+
+  open_gpio_map(path=DEV_MEM)
+    - Return a GPIOMap shared by all callers using the same path
+
+  create_fake_register_map(path)
+    - Create a zero filled file that can be used as a fake register map
+
+"""
+import mmap
+import os
+
+from gpio_pins import gpio_bank_bit
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DEV_MEM                     = "/dev/mem"
+
+# See AM335x Technical Reference Manual, Table 2-3 and Section 25.4
+GPIO_BANK_BASES             = [0x44E07000, 0x4804C000, 0x481AC000, 0x481AE000]
+GPIO_BANK_SIZE              = 0x1000
+
+GPIO_OE                     = 0x134  # Output enable (0 = output, 1 = input)
+GPIO_DATAIN                 = 0x138
+GPIO_DATAOUT                = 0x13C
+GPIO_CLEARDATAOUT           = 0x190
+GPIO_SETDATAOUT             = 0x194
+
+DIRECTION_OUT               = 0
+DIRECTION_IN                = 1
+
+# ------------------------------------------------------------------------
+# Global variables
+# ------------------------------------------------------------------------
+
+gpio_maps                   = {}     # Shared maps, by path
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def open_gpio_map(path=DEV_MEM):
+    """ Return the GPIOMap shared by all callers using "path" """
+    if path not in gpio_maps:
+        gpio_maps[path] = GPIOMap(path)
+    
+    return gpio_maps[path]
+
+# End def
+
+
+def create_fake_register_map(path):
+    """ Create a zero filled file that can be used as a fake register map """
+    with open(path, "wb") as f:
+        f.write(bytes(GPIO_BANK_SIZE * len(GPIO_BANK_BASES)))
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Classes
+# ------------------------------------------------------------------------
+
+class GPIOMap():
+    """ Memory-mapped AM335x GPIO banks """
+    path            = None
+    fake            = None
+    maps            = None   # mmap object per bank
+    registers       = None   # 32-bit memoryview per bank
+    
+    def __init__(self, path=DEV_MEM):
+        """ Map the GPIO banks """
+        self.path      = path
+        self.fake      = (path != DEV_MEM)
+        self.maps      = []
+        self.registers = []
+        
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        
+        try:
+            for bank, base in enumerate(GPIO_BANK_BASES):
+                # A fake map holds the banks back to back
+                offset = bank * GPIO_BANK_SIZE if self.fake else base
+                
+                bank_map = mmap.mmap(fd, GPIO_BANK_SIZE, mmap.MAP_SHARED, 
+                                     mmap.PROT_READ | mmap.PROT_WRITE, 
+                                     offset=offset)
+                
+                # Index 32-bit words so that each access is a single load / store
+                self.maps.append(bank_map)
+                self.registers.append(memoryview(bank_map).cast("I"))
+        except:
+            self.close()
+            raise
+        finally:
+            # The mappings stay valid after the file is closed
+            os.close(fd)
+    
+    # End def
+    
+    
+    def read_register(self, bank, offset):
+        """ Return the 32-bit register at "offset" in the bank """
+        return self.registers[bank][offset >> 2]
+    
+    # End def
+    
+    
+    def write_register(self, bank, offset, value):
+        """ Write the 32-bit register at "offset" in the bank """
+        self.registers[bank][offset >> 2] = value & 0xFFFFFFFF
+    
+    # End def
+    
+    
+    def read_bank(self, bank):
+        """ Return the DATAIN value of the bank (all 32 pins) """
+        return self.registers[bank][GPIO_DATAIN >> 2]
+    
+    # End def
+    
+    
+    def set_bits(self, bank, mask):
+        """ Drive the pins in the mask high """
+        registers = self.registers[bank]
+        registers[GPIO_SETDATAOUT >> 2] = mask
+        
+        if self.fake:
+            registers[GPIO_DATAOUT >> 2] |= mask
+            registers[GPIO_DATAIN >> 2]  |= mask
+    
+    # End def
+    
+    
+    def clear_bits(self, bank, mask):
+        """ Drive the pins in the mask low """
+        registers = self.registers[bank]
+        registers[GPIO_CLEARDATAOUT >> 2] = mask
+        
+        if self.fake:
+            registers[GPIO_DATAOUT >> 2] &= ~mask & 0xFFFFFFFF
+            registers[GPIO_DATAIN >> 2]  &= ~mask & 0xFFFFFFFF
+    
+    # End def
+    
+    
+    def input(self, pin):
+        """ Return the value (0 / 1) of the pin """
+        bank, bit = gpio_bank_bit(pin)
+        return (self.registers[bank][GPIO_DATAIN >> 2] >> bit) & 1
+    
+    # End def
+    
+    
+    def output(self, pin, value):
+        """ Drive the pin high (value true) or low (value false) """
+        bank, bit = gpio_bank_bit(pin)
+        
+        if value:
+            self.set_bits(bank, 1 << bit)
+        else:
+            self.clear_bits(bank, 1 << bit)
+    
+    # End def
+    
+    
+    def setup(self, pin, direction):
+        """ Set the pin direction in the OE register """
+        bank, bit = gpio_bank_bit(pin)
+        oe        = self.read_register(bank, GPIO_OE)
+        
+        if direction == DIRECTION_IN:
+            oe |= (1 << bit)
+        else:
+            oe &= ~(1 << bit)
+        
+        self.write_register(bank, GPIO_OE, oe)
+    
+    # End def
+    
+    
+    def close(self):
+        """ Unmap the banks """
+        for registers in self.registers:
+            registers.release()
+        
+        for bank_map in self.maps:
+            bank_map.close()
+        
+        self.registers = []
+        self.maps      = []
+        
+        if gpio_maps.get(self.path) is self:
+            del gpio_maps[self.path]
+    
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+    import tempfile
+    import time
+
+    print("GPIO mmap Test")
+    
+    # Use the real registers if a path is given (e.g. /dev/mem), otherwise 
+    # run against a fake register map
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "gpio_regs")
+        create_fake_register_map(path)
+    
+    gpio_map = open_gpio_map(path)
+    print("Register map: {0}".format(path))
+    
+    # Toggle USR3 and read it back
+    gpio_map.output("USR3", 1)
+    print("USR3 after output(1): {0}".format(gpio_map.input("USR3")))
+    gpio_map.output("USR3", 0)
+    print("USR3 after output(0): {0}".format(gpio_map.input("USR3")))
+    
+    for bank in range(len(GPIO_BANK_BASES)):
+        print("Bank {0} DATAIN: 0x{1:08X}".format(bank, gpio_map.read_bank(bank)))
+    
+    # Time pin reads
+    count = 100000
+    start = time.time()
+    for i in range(count):
+        gpio_map.input("P2_2")
+    print("input(): {0:.2f} us per read".format((time.time() - start) / count * 1e6))
+    
+    gpio_map.close()
+    
+    print("Test Complete")
+
@@ -50,10 +50,24 @@ configuration, active_low=False.
   
 Software API:
 
-  ThreadedButton(pin, sleep_time=0.1, active_low=True)
+  ThreadedButton(pin, sleep_time=0.1, active_low=True, edge_detect=False,
+                 debounce_time=None, debounce_samples=None, gpio_map=None)
     - Provide pin that the button monitors
     - The sleep_time is the time between calls to the callback functions
       while the button is waiting in either the pressed or unpressed state
+    - If edge_detect is True, the thread waits for GPIO edges reported by 
+      the kernel instead of polling the pin every "sleep_time".  Waiting 
+      then takes no CPU, presses shorter than "sleep_time" are not missed, 
+      and press / release times come from the edge.  Only edges that leave
+      the pin at the pressed level count as presses, and edges within 
+      EDGE_BOUNCE_TIME of a release are ignored as release bounce.
+    - Debouncing (see debounce.py) is off by default.  debounce_time 
+      ignores changes within that many seconds of the last accepted change;
+      debounce_samples requires that many more pressed than unpressed 
+      samples (integrator) before a change is accepted.
+    - gpio_map (optional) is a GPIOMap (see gpio_mmap.py).  The pin is then
+      read straight from the memory-mapped DATAIN register instead of 
+      through Adafruit_BBIO.GPIO.input().
     - By default, the button is "active_low" (i.e. the button has a 
       pull up resistor between the button and the processor pin and 
       will be connected to ground when the button is pressed.  The 
@@ -64,13 +78,20 @@ Software API:
     start()
       - Starts the button thread
     
-    is_pressed()
+    is_pressed(snapshot=None)
       - Return a boolean value (i.e. True/False) on if button is pressed
       - Function consumes no time
+      - If a PinSnapshot (see pin_snapshot.py) is given, the pin value from
+        its last read() is used instead of reading the pin
+      - If the button is debounced, the debounced state kept by the button
+        thread is returned instead (the pin and snapshot are not read)
     
     get_last_press_duration()
       - Return the duration the button was last pressed
 
+    get_bounces_rejected()
+      - Return the number of bounces rejected by the debounce filter
+
     cleanup()
       - Stops the button so thread can exit
       
@@ -99,6 +120,8 @@ import threading
 
 import Adafruit_BBIO.GPIO as GPIO
 
+from debounce import Debouncer
+
 # ------------------------------------------------------------------------
 # Constants
 # ------------------------------------------------------------------------
@@ -106,6 +129,9 @@ import Adafruit_BBIO.GPIO as GPIO
 HIGH          = GPIO.HIGH
 LOW           = GPIO.LOW
 
+EDGE_BOUNCE_TIME = 0.01     # seconds after a release in which edges to the 
+                            # pressed level are bounce (edge_detect, no debouncer)
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -124,9 +150,17 @@ class ThreadedButton(threading.Thread):
     pressed_value                 = None
 
     sleep_time                    = None
-    stop_button                   = None
+    stop_event                    = None # set to stop the thread
     press_duration                = None
 
+    edge_detect                   = None
+    edge_event                    = None # set by the GPIO edge thread
+    edge_time                     = None # time of the last edge
+    press_edge_time               = None # time of the last edge to the pressed level
+    release_time                  = None # time of the last release
+    debouncer                     = None # None if not debounced
+    gpio_map                      = None # None to use Adafruit_BBIO.GPIO
+
     pressed_callback              = None
     pressed_callback_value        = None
     unpressed_callback            = None
@@ -136,7 +170,8 @@ class ThreadedButton(threading.Thread):
     on_release_callback           = None
     on_release_callback_value     = None
     
-    def __init__(self, pin=None, sleep_time=0.1, active_low=True):
+    def __init__(self, pin=None, sleep_time=0.1, active_low=True, edge_detect=False,
+                 debounce_time=None, debounce_samples=None, gpio_map=None):
         """ Initialize variables and set up the button """
         # Call parent class constructor
         threading.Thread.__init__(self)        
@@ -157,8 +192,18 @@ class ThreadedButton(threading.Thread):
 
         # Initialize Class Variables      
         self.sleep_time      = sleep_time
-        self.stop_button     = False
+        self.stop_event      = threading.Event()
         self.press_duration  = 0.0
+        
+        self.edge_detect     = edge_detect
+        self.edge_event      = threading.Event()
+        
+        if debounce_samples is not None:
+            self.debouncer   = Debouncer(samples=debounce_samples)
+        elif debounce_time is not None:
+            self.debouncer   = Debouncer(window=debounce_time)
+        
+        self.gpio_map        = gpio_map
 
         # All callback functions and values set to None if not used        
         
@@ -172,17 +217,140 @@ class ThreadedButton(threading.Thread):
         """ Setup the hardware components. """
         # Initialize Button
         GPIO.setup(self.pin, GPIO.IN)
+        
+        # Have the kernel report both edges (epoll on the GPIO value file)
+        if self.edge_detect:
+            GPIO.add_event_detect(self.pin, GPIO.BOTH, callback=self._on_edge)
+
+    # End def
+
+
+    def _on_edge(self, channel):
+        """ Called by the GPIO library on every edge of the pin """
+        now = time.time()
+        
+        # Only an edge that leaves the pin at the pressed level can be a press
+        if self._read() == self.pressed_value:
+            self.press_edge_time = now
+        
+        self.edge_time = now
+        self.edge_event.set()
+
+    # End def
+
+
+    def _wait_for_change(self, callback):
+        """ Wait until the button may have changed state.
+        
+           Polling:      Sleep for "sleep_time"
+           Edge detect:  Block until an edge arrives.  If there is a callback
+                         to execute while waiting, wake up every "sleep_time"
+        
+           Returns:  Time of the edge, or None if no edge was seen
+        """
+        if not self.edge_detect:
+            # Sleep, but wake up right away if the thread is stopped
+            self.stop_event.wait(self.sleep_time)
+            return None
+        
+        # Wake up to run the callback, or to confirm a debounced change
+        if (callback is not None) or ((self.debouncer is not None) and not self.debouncer.is_settled()):
+            timeout = self.sleep_time
+        else:
+            timeout = None
+        
+        if self.edge_event.wait(timeout):
+            self.edge_event.clear()
+            return self.edge_time
+        
+        return None
+
+    # End def
+
+
+    def _read(self, snapshot=None):
+        """ Return the pin value (or take it from the snapshot) """
+        if snapshot is not None:
+            return snapshot.input(self.pin)
+        
+        if self.gpio_map is not None:
+            return self.gpio_map.input(self.pin)
+        
+        return GPIO.input(self.pin)
 
     # End def
 
 
-    def is_pressed(self):
-        """ Is the Button pressed?
+    def _sample(self, snapshot=None):
+        """ Read the pin (or take it from the snapshot) and pass it through 
+        the debounce filter (if any)
         
            Returns:  True  - Button is pressed
                      False - Button is not pressed
         """
-        return GPIO.input(self.pin) == self.pressed_value
+        pressed = (self._read(snapshot) == self.pressed_value)
+        
+        if self.debouncer is None:
+            return pressed
+        
+        return self.debouncer.update(pressed, time.time())
+
+    # End def
+
+
+    def _settle_release(self):
+        """ Edge detect without a debouncer:  wait until EDGE_BOUNCE_TIME 
+        after the last release, so the release bounce is not seen as a press """
+        if (not self.edge_detect) or (self.debouncer is not None) or (self.release_time is None):
+            return
+        
+        remaining = self.release_time + EDGE_BOUNCE_TIME - time.time()
+        
+        if remaining > 0:
+            self.stop_event.wait(remaining)
+
+    # End def
+
+
+    def _edge_press_time(self, edge_time):
+        """ Return the press time if an edge seen while the button is 
+        unpressed is a press, otherwise None.  The pin must have been at the 
+        pressed level at an edge (a release edge is not a press), and edges 
+        within the debounce window are rejected as bounces. """
+        press_time = self.press_edge_time
+        
+        if (edge_time is None) or (press_time is None):
+            return None
+        
+        if (self.debouncer is not None) and not self.debouncer.edge(True, press_time):
+            return None
+        
+        return press_time
+
+    # End def
+
+
+    def get_bounces_rejected(self):
+        """ Return the number of bounces rejected by the debounce filter """
+        if self.debouncer is None:
+            return 0
+        
+        return self.debouncer.get_bounces_rejected()
+
+    # End def
+
+
+    def is_pressed(self, snapshot=None):
+        """ Is the Button pressed?  If debounced, this is the debounced state
+        kept by the button thread (the filter is only updated by that thread)
+        
+           Returns:  True  - Button is pressed
+                     False - Button is not pressed
+        """
+        if self.debouncer is not None:
+            return self.debouncer.state
+        
+        return self._read(snapshot) == self.pressed_value
 
     # End def
 
@@ -192,23 +360,43 @@ class ThreadedButton(threading.Thread):
         button_press_time     = None
 
         # Run button monitor until told to stop        
-        while(self.stop_button == False): 
+        while(not self.stop_event.is_set()): 
         
+            # Ignore edges from the previous press (and its release bounce)
+            self._settle_release()
+            self.edge_event.clear()
+            self.press_edge_time = None
+            button_press_time = None
+            
             # Wait for button press
             #   Execute the unpressed callback function based on the sleep time
             #
-            while(GPIO.input(self.pin) == self.unpressed_value):
+            while(not self._sample()):
             
                 if self.unpressed_callback is not None:
                     self.unpressed_callback_value = self.unpressed_callback()
                 
-                if self.stop_button:
+                if self.stop_event.is_set():
                     break
                 
-                time.sleep(self.sleep_time)
+                # From the unpressed state, an edge to the pressed level is a
+                # press (even if the button was already released again)
+                edge_time = self._wait_for_change(self.unpressed_callback)
+                
+                button_press_time = self._edge_press_time(edge_time)
+                
+                if button_press_time is not None:
+                    break
+                
+                if self.stop_event.is_set():
+                    break
+            
+            if self.stop_event.is_set():
+                break
             
             # Record time
-            button_press_time = time.time()
+            if button_press_time is None:
+                button_press_time = time.time()
             
             # Executed the on press callback function
             if self.on_press_callback is not None:
@@ -217,25 +405,34 @@ class ThreadedButton(threading.Thread):
             # Wait for button release
             #   Execute the pressed callback function based on the sleep time
             #
-            while(GPIO.input(self.pin) == self.pressed_value):
+            button_release_time = None
+            
+            while(self._sample()):
             
                 if self.pressed_callback is not None:
                     self.pressed_callback_value = self.pressed_callback()
                     
-                if self.stop_button:
+                if self.stop_event.is_set():
                     break
                     
-                time.sleep(self.sleep_time)
+                button_release_time = self._wait_for_change(self.pressed_callback)
             
             # Record the press duration
-            self.press_duration = time.time() - button_press_time
+            if (button_release_time is None) or (button_release_time < button_press_time):
+                button_release_time = time.time()
+            
+            self.press_duration = button_release_time - button_press_time
+            self.release_time   = button_release_time
 
             # Executed the on release callback function
             if self.on_release_callback is not None:
                 self.on_release_callback_value = self.on_release_callback()        
         
-        # Set the flag and press duration to allow the button thread to restart
-        self.stop_button    = False
+        # Stop edge detection
+        if self.edge_detect:
+            GPIO.remove_event_detect(self.pin)
+        
+        # Reset the press duration
         self.press_duration = 0.0
         
     # End def
@@ -250,11 +447,15 @@ class ThreadedButton(threading.Thread):
     
     def cleanup(self):
         """ Clean up the button hardware. """
-        # Nothing to do for GPIO; stop the thread and wait for completion
-        self.stop_button = True
+        # Stop the thread; this also interrupts a sleep between polls
+        self.stop_event.set()
+        
+        # Wake up the thread if it is blocked waiting for an edge
+        self.edge_event.set()
 
-        while (self.stop_button):
-            time.sleep(self.sleep_time)
+        # Wait for completion
+        if self.is_alive():
+            self.join()
     
     # End def
     
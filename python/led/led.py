@@ -40,9 +40,12 @@ such that the LED is ON when the output is "High"/"1" and OFF when the output is
 
 Software API:
 
-  LED(pin, low_off=True)
+  LED(pin, low_off=True, gpio_map=None)
     - Provide pin that the LED is connected
     - Default in active high configuration
+    - gpio_map (optional) is a GPIOMap (see button/gpio_mmap.py).  The pin 
+      is then driven through the memory-mapped SETDATAOUT / CLEARDATAOUT 
+      registers instead of through Adafruit_BBIO.GPIO.output().
     
     is_on()
       - Return a boolean value (i.e. True/False) if the LED is ON / OFF
@@ -78,8 +81,9 @@ class LED():
     pin             = None
     on_value        = None # keep generic bc we don't know whether active high/active low
     off_value       = None
+    gpio_map        = None # None to use Adafruit_BBIO.GPIO
     
-    def __init__(self, pin=None, low_off=True):
+    def __init__(self, pin=None, low_off=True, gpio_map=None):
         """ Initialize variables and set up the LED """
         if (pin == None):
             raise ValueError("Pin not provided for LED()")
@@ -94,6 +98,8 @@ class LED():
         else:
             self.on_value  = LOW
             self.off_value = HIGH
+        
+        self.gpio_map = gpio_map
 
         # Initialize the hardware components        
         self._setup()
@@ -113,13 +119,24 @@ class LED():
     # End def
 
 
+    def _output(self, value):
+        """ Drive the pin to the value """
+        if self.gpio_map is not None:
+            self.gpio_map.output(self.pin, value)
+        else:
+            GPIO.output(self.pin, value)
+
+    # End def
+
+
     def is_on(self):
         """ Is the LED on?
         
            Returns:  True  - LED is ON
                      False - LED is OFF
         """
-        
+        if self.gpio_map is not None:
+            return self.gpio_map.input(self.pin) == self.on_value
 
         return GPIO.input(self.pin) == self.on_value
 
@@ -128,7 +145,7 @@ class LED():
     
     def on(self):
         """ Turn the LED ON """
-        GPIO.output(self.pin, self.on_value)
+        self._output(self.on_value)
 
     
     # End def
@@ -136,8 +153,7 @@ class LED():
     
     def off(self):
         """ Turn the LED OFF """
-
-        GPIO.output(self.pin, self.off_value)
+        self._output(self.off_value)
     
     # End def
 